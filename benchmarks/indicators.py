@@ -0,0 +1,304 @@
+"""Parity check and speed comparison of vectorised indicators against the old loops.
+
+Run from the repository root::
+
+    python -m benchmarks.indicators --bars 2000 --repeat 5
+
+Every ``*_series`` output is compared bar by bar with a plain-loop reference;
+the exit status is non-zero if any differs by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from bot.core import indicators
+from bot.core.indicators import Candle
+
+
+def legacy_ema(values: List[float], period: int) -> Optional[float]:
+    if len(values) < period or period <= 0:
+        return None
+    multiplier = 2 / (period + 1)
+    ema_value = sum(values[:period]) / period
+    for value in values[period:]:
+        ema_value = (value - ema_value) * multiplier + ema_value
+    return ema_value
+
+
+def legacy_macd(values: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
+    if len(values) < slow + signal:
+        return {"macd": None, "signal": None, "hist": None}
+    ema_fast = legacy_ema(values, fast)
+    ema_slow = legacy_ema(values, slow)
+    macd_line = ema_fast - ema_slow
+    history = []
+    for i in range(slow, len(values) + 1):
+        slice_values = values[:i]
+        history.append(legacy_ema(slice_values, fast) - legacy_ema(slice_values, slow))
+    signal_val = legacy_ema(history, signal) if history else None
+    hist = macd_line - signal_val if signal_val is not None else None
+    return {"macd": macd_line, "signal": signal_val, "hist": hist}
+
+
+def legacy_rsi(values: List[float], period: int = 14) -> Optional[float]:
+    if len(values) < period + 1:
+        return None
+    gains = []
+    losses = []
+    for prev, curr in zip(values[-(period + 1) : -1], values[-period:]):
+        change = curr - prev
+        gains.append(max(change, 0))
+        losses.append(max(-change, 0))
+    avg_gain = sum(gains) / period
+    avg_loss = sum(losses) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def legacy_adx(candles: List[Candle], period: int = 14) -> Optional[float]:
+    if len(candles) < period + 1:
+        return None
+    trs, plus_dm, minus_dm = [], [], []
+    for prev, curr in zip(candles[:-1], candles[1:]):
+        trs.append(
+            max(curr.high - curr.low, abs(curr.high - prev.close), abs(curr.low - prev.close))
+        )
+        up_move = curr.high - prev.high
+        down_move = prev.low - curr.low
+        plus_dm.append(up_move if up_move > down_move and up_move > 0 else 0)
+        minus_dm.append(down_move if down_move > up_move and down_move > 0 else 0)
+    tr14 = sum(trs[-period:])
+    if tr14 == 0:
+        return None
+    plus_di = 100 * (sum(plus_dm[-period:]) / tr14)
+    minus_di = 100 * (sum(minus_dm[-period:]) / tr14)
+    return 100 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
+
+
+def _nan_list(length: int) -> List[float]:
+    return [math.nan] * length
+
+
+def reference_sma(values: List[float], period: int) -> List[float]:
+    out = _nan_list(len(values))
+    for end in range(period, len(values) + 1):
+        out[end - 1] = sum(values[end - period : end]) / period
+    return out
+
+
+def reference_ema(values: List[float], period: int) -> List[float]:
+    out = _nan_list(len(values))
+    if len(values) < period:
+        return out
+    multiplier = 2 / (period + 1)
+    current = sum(values[:period]) / period
+    out[period - 1] = current
+    for index in range(period, len(values)):
+        current = (values[index] - current) * multiplier + current
+        out[index] = current
+    return out
+
+
+def reference_roc(values: List[float], period: int = 14) -> List[float]:
+    out = _nan_list(len(values))
+    for index in range(period, len(values)):
+        previous = values[index - period]
+        if previous != 0:
+            out[index] = (values[index] - previous) / previous * 100
+    return out
+
+
+def reference_macd(
+    values: List[float], fast: int = 12, slow: int = 26, signal: int = 9
+) -> Dict[str, List[float]]:
+    length = len(values)
+    empty = {"macd": _nan_list(length), "signal": _nan_list(length), "hist": _nan_list(length)}
+    if length < slow + signal:
+        return empty
+    fast_ema, slow_ema = reference_ema(values, fast), reference_ema(values, slow)
+    line = [f - s for f, s in zip(fast_ema, slow_ema)]
+    signal_line = _nan_list(slow - 1) + reference_ema(line[slow - 1 :], signal)
+    ready = slow + signal - 1
+    for index in range(ready):
+        line[index] = signal_line[index] = math.nan
+    return {
+        "macd": line,
+        "signal": signal_line,
+        "hist": [m - s for m, s in zip(line, signal_line)],
+    }
+
+
+def _reference_wilder(values: List[float], period: int, start: int) -> List[float]:
+    out = _nan_list(len(values))
+    first = start + period - 1
+    if len(values) <= first:
+        return out
+    current = sum(values[start : first + 1]) / period
+    out[first] = current
+    for index in range(first + 1, len(values)):
+        current = (current * (period - 1) + values[index]) / period
+        out[index] = current
+    return out
+
+
+def reference_rsi(values: List[float], period: int = 14) -> List[float]:
+    """Wilder RSI, one bar at a time."""
+    out = _nan_list(len(values))
+    if len(values) < period + 1:
+        return out
+    gains, losses = [0.0], [0.0]
+    for previous, current in zip(values[:-1], values[1:]):
+        gains.append(max(current - previous, 0.0))
+        losses.append(max(previous - current, 0.0))
+    avg_gain = _reference_wilder(gains, period, 1)
+    avg_loss = _reference_wilder(losses, period, 1)
+    for index in range(period, len(values)):
+        if avg_loss[index] == 0:
+            out[index] = 100.0
+        else:
+            out[index] = 100 - 100 / (1 + avg_gain[index] / avg_loss[index])
+    return out
+
+
+def reference_adx(
+    high: List[float], low: List[float], close: List[float], period: int = 14
+) -> List[float]:
+    """Wilder ADX, one bar at a time."""
+    length = len(close)
+    if length < 2 * period:
+        return _nan_list(length)
+    true_range, plus_dm, minus_dm = [0.0], [0.0], [0.0]
+    for index in range(1, length):
+        true_range.append(
+            max(
+                high[index] - low[index],
+                abs(high[index] - close[index - 1]),
+                abs(low[index] - close[index - 1]),
+            )
+        )
+        up_move = high[index] - high[index - 1]
+        down_move = low[index - 1] - low[index]
+        plus_dm.append(up_move if up_move > down_move and up_move > 0 else 0.0)
+        minus_dm.append(down_move if down_move > up_move and down_move > 0 else 0.0)
+    atr = _reference_wilder(true_range, period, 1)
+    plus_avg = _reference_wilder(plus_dm, period, 1)
+    minus_avg = _reference_wilder(minus_dm, period, 1)
+    dx = [0.0] * length
+    for index in range(period, length):
+        plus_di = 100 * plus_avg[index] / atr[index] if atr[index] > 0 else 0.0
+        minus_di = 100 * minus_avg[index] / atr[index] if atr[index] > 0 else 0.0
+        dx[index] = 100 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
+    return _reference_wilder(dx, period, period)
+
+
+def _difference(new: np.ndarray, reference: List[float]) -> float:
+    """Largest difference relative to the reference's scale; ``inf`` if warm-up bars differ."""
+    expected = np.asarray(reference, dtype=np.float64)
+    if len(new) != len(expected) or not np.array_equal(np.isnan(new), np.isnan(expected)):
+        return math.inf
+    ready = ~np.isnan(expected)
+    if not ready.any():
+        return 0.0
+    scale = np.fmax(1.0, np.abs(expected[ready]))
+    return float(np.max(np.abs(new[ready] - expected[ready]) / scale))
+
+
+def random_walk(bars: int, seed: int = 7) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    spread = np.abs(rng.normal(0, 0.003, bars)) * close
+    return {
+        "open": close + rng.normal(0, 0.001, bars) * close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+    }
+
+
+def _best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def check_parity(bars: int) -> Dict[str, float]:
+    """Relative difference per indicator between each ``*_series`` and its loop reference."""
+    data = random_walk(bars)
+    high, low, close = data["high"], data["low"], data["close"]
+    values = close.tolist()
+    macd_full = indicators.macd_series(close)
+    macd_reference = reference_macd(values)
+    pairs = {
+        "ma20": (indicators.sma_series(close, 20), reference_sma(values, 20)),
+        "ema20": (indicators.ema_series(close, 20), reference_ema(values, 20)),
+        "ema200": (indicators.ema_series(close, 200), reference_ema(values, 200)),
+        "roc14": (indicators.roc_series(close, 14), reference_roc(values, 14)),
+        "rsi14": (indicators.rsi_series(close, 14), reference_rsi(values, 14)),
+        "adx14": (
+            indicators.adx_series(high, low, close, 14),
+            reference_adx(high.tolist(), low.tolist(), values, 14),
+        ),
+        "macd": (macd_full["macd"], macd_reference["macd"]),
+        "macds": (macd_full["signal"], macd_reference["signal"]),
+        "macdh": (macd_full["hist"], macd_reference["hist"]),
+    }
+    # A flat stretch drives the average loss to zero, where RSI must read 100.
+    flat = np.concatenate((close[:50], np.full(30, close[49]), close[50:100]))
+    pairs["rsi14 (flat)"] = (indicators.rsi_series(flat, 14), reference_rsi(flat.tolist(), 14))
+    return {name: _difference(new, reference) for name, (new, reference) in pairs.items()}
+
+
+def benchmark(bars: int, repeat: int) -> Dict[str, tuple]:
+    data = random_walk(bars)
+    close = data["close"]
+    values = close.tolist()
+    candles = [
+        Candle(open=o, high=h, low=lo, close=c, volume=0.0)
+        for o, h, lo, c in zip(data["open"], data["high"], data["low"], values)
+    ]
+    cases = {
+        "ema20": (lambda: legacy_ema(values, 20), lambda: indicators.ema_series(close, 20)),
+        "rsi14": (lambda: legacy_rsi(values, 14), lambda: indicators.rsi_series(close, 14)),
+        "adx14": (
+            lambda: legacy_adx(candles, 14),
+            lambda: indicators.adx_series(data["high"], data["low"], close, 14),
+        ),
+        "macd": (lambda: legacy_macd(values), lambda: indicators.macd_series(close)),
+    }
+    return {
+        name: (_best_of(repeat, old), _best_of(repeat, new))
+        for name, (old, new) in cases.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    print(f"Parity vs loop references ({args.bars} bars, max relative diff):")
+    diffs = check_parity(args.bars)
+    for name, diff in diffs.items():
+        print(f"  {'ok  ' if diff <= args.tolerance else 'FAIL'} {name:<16} {diff:.3e}")
+    print(f"\nTiming, best of {args.repeat} (legacy returns last value, new returns full series):")
+    for name, (old, new) in benchmark(args.bars, args.repeat).items():
+        print(f"  {name:<8} legacy {old * 1e3:9.3f} ms   vectorised {new * 1e3:7.3f} ms   "
+              f"x{old / new:,.1f}")
+    sys.exit(0 if all(diff <= args.tolerance for diff in diffs.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Offline checks of the outbox and the bot's replies against a fake Bot API.
+
+Run from the repository root::
+
+    python -m benchmarks.outbox
+
+Each check prints ``ok`` or ``FAIL``; the exit status is non-zero if any failed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+from benchmarks.universe import LatencyProvider, synthetic_universe
+from bot.config import load_settings
+from bot.outbox import Outbox
+
+NO_MATCH = "Tidak ada saham yang memenuhi kriteria saat ini."
+NO_MATCH_FILTER = "price > 1000000000"
+
+
+class FakeBotApi:
+    """Stands in for ``telegram.Bot``, recording every ``send_message`` as ``(chat_id, text)``."""
+
+    def __init__(self) -> None:
+        self.sent: List[Tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent.append((chat_id, text))
+
+
+class RetryAfter(Exception):
+    """Shaped like ``telegram.error.RetryAfter``."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class FloodedBotApi(FakeBotApi):
+    """Answers the first message to ``chat_id`` with ``RetryAfter(retry_after)``."""
+
+    def __init__(self, chat_id: int, retry_after: float) -> None:
+        super().__init__()
+        self.chat_id = chat_id
+        self.retry_after = retry_after
+        self.flooded = False
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        if chat_id == self.chat_id and not self.flooded:
+            self.flooded = True
+            raise RetryAfter(self.retry_after)
+        await super().send_message(chat_id, text)
+
+
+class _Message:
+    def __init__(self, chat_id: int) -> None:
+        self.chat_id = chat_id
+
+    async def reply_text(self, text: str) -> None:
+        raise AssertionError("replies must go through the outbox")
+
+
+async def _drain(outbox: Outbox) -> None:
+    while outbox.pending():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+async def _check_outbox() -> Dict[str, bool]:
+    api = FakeBotApi()
+    outbox = Outbox(api, global_rate=1000, chat_rate=1000, chat_burst=1000)
+    checks: Dict[str, bool] = {}
+
+    outbox.send(1, "status", quiet=True)
+    await _drain(outbox)
+    outbox.send(1, "status", quiet=True)
+    await _drain(outbox)
+    checks["repeated quiet status sent once"] = api.sent == [(1, "status")]
+
+    outbox.send(1, "news")
+    outbox.send(1, "status", quiet=True)
+    await _drain(outbox)
+    checks["quiet status dropped behind news"] = api.sent[1:] == [(1, "news")]
+
+    outbox.send(1, "status", quiet=True)
+    await _drain(outbox)
+    checks["status sent again after news"] = api.sent[2:] == [(1, "status")]
+    await outbox.stop()
+
+    api = FloodedBotApi(chat_id=1, retry_after=0.3)
+    outbox = Outbox(api, global_rate=1000, chat_rate=1000, chat_burst=1000)
+    outbox.send(1, "flooded")
+    await asyncio.sleep(0.01)
+    outbox.send(2, "other")
+    await asyncio.sleep(0.05)
+    checks["other chats served during a retry_after"] = api.sent == [(2, "other")]
+    await _drain(outbox)
+    checks["flooded chat resent after retry_after"] = api.sent == [(2, "other"), (1, "flooded")]
+    await outbox.stop()
+    return checks
+
+
+async def _check_bot(bot, api: FakeBotApi) -> Dict[str, bool]:
+    from bot.core.engine import ScreeningResult
+    from bot.telegram_bot import AlertState
+
+    bot.outbox = Outbox(api, global_rate=1000, chat_rate=1000, chat_burst=1000)
+    checks: Dict[str, bool] = {}
+
+    for _ in range(3):
+        await bot._run_once(_Message(1), NO_MATCH_FILTER)
+        await _drain(bot.outbox)
+    checks["every /scr gets its no-match reply"] = api.sent == [(1, NO_MATCH)] * 3
+
+    api.sent.clear()
+    message = _Message(2)
+    bot._alerts[2] = AlertState(message=message, repeat=True)
+    for _ in range(3):
+        await bot._handle_tick(2, [ScreeningResult(symbol="AAAA", passed=False)], [])
+        await _drain(bot.outbox)
+    checks["repeated alert status sent once"] = api.sent == [(2, NO_MATCH)]
+
+    api.sent.clear()
+    await bot._run_once(message, NO_MATCH_FILTER)
+    await _drain(bot.outbox)
+    checks["/scr answered in a chat with a quiet alert"] = api.sent == [(2, NO_MATCH)]
+    await bot.outbox.stop()
+    return checks
+
+
+def check_bot_replies(symbols: int = 20) -> Dict[str, bool]:
+    """``/scr`` replies are never deduplicated; alert status chatter is."""
+    from bot.telegram_bot import TelegramBot
+
+    universe = synthetic_universe(symbols, days=2)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+        handle.write("\n".join(universe))
+        path = handle.name
+    settings = replace(
+        load_settings(),
+        bei_tickers_file=path,
+        bei_tickers_url="",
+        candle_store_dir="",
+        market_hours_only=False,
+        screening_shards=1,
+    )
+    bot = TelegramBot(settings, provider=LatencyProvider(universe))
+    try:
+        return asyncio.run(_check_bot(bot, FakeBotApi()))
+    finally:
+        bot.engine.close()
+        os.unlink(path)
+
+
+def _report(title: str, checks: Dict[str, bool]) -> bool:
+    print(title)
+    for name, passed in checks.items():
+        print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+    return all(checks.values())
+
+
+def main() -> None:
+    outbox = _report("Outbox against a fake Bot API:", asyncio.run(_check_outbox()))
+    bot = _report("TelegramBot replies through the outbox:", check_bot_replies())
+    sys.exit(0 if outbox and bot else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Offline checks of the market-data providers against stubbed upstreams.
+
+Run from the repository root::
+
+    python -m benchmarks.providers
+
+Each check prints ``ok`` or ``FAIL``; the exit status is non-zero if any failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import date
+import gzip
+import importlib.util
+import json
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from benchmarks.standin import Response, StandInServer
+from benchmarks.universe import session_timestamps, synthetic_series, synthetic_symbols
+from bot.core.candle_cache import CandleCache
+from bot.core.candle_store import CandleStore
+from bot.core.chart_api import ChartApiProvider
+from bot.core.engine import run_screening
+from bot.core.filters import compile_filters
+from bot.core.market_data import MarketSnapshot, NoDataError, UpstreamError, YFinanceProvider
+from bot.core.series import CandleSeries
+
+
+def stub_universe(symbols: int, days: int, seed: int = 7) -> Dict[str, CandleSeries]:
+    """Synthetic bars ending today, so the provider's resume window applies."""
+    rng = np.random.default_rng(seed)
+    timestamps = session_timestamps(days, end=date.today())
+    return {symbol: synthetic_series(timestamps, rng) for symbol in synthetic_symbols(symbols)}
+
+
+def _frame(series: CandleSeries) -> Any:
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "Open": series.open,
+            "High": series.high,
+            "Low": series.low,
+            "Close": series.close,
+            "Volume": series.volume,
+        },
+        index=pd.to_datetime(series.timestamps, utc=True),
+    )
+
+
+class StubDownload:
+    """Stands in for ``yfinance.download(group_by="ticker")``.
+
+    Serves the first ``visible`` bars of each series as one multi-index frame
+    and records the keyword arguments of every call. Symbols in ``missing``
+    are left out of the frame, as yfinance does for failed tickers.
+    """
+
+    def __init__(self, universe: Dict[str, CandleSeries], suffix: str = ".JK") -> None:
+        self.universe = universe
+        self.suffix = suffix
+        self.visible = min(len(series) for series in universe.values())
+        self.missing: set = set()
+        self.calls: List[Dict[str, Any]] = []
+
+    def __call__(self, tickers: List[str], **options: Any) -> Any:
+        import pandas as pd
+
+        self.calls.append({"tickers": list(tickers), **options})
+        frames = {}
+        for ticker in tickers:
+            symbol = ticker[: -len(self.suffix)]
+            if symbol in self.missing or symbol not in self.universe:
+                continue
+            frame = _frame(self.universe[symbol][: self.visible])
+            if "start" in options:
+                frame = frame[frame.index >= options["start"]]
+            frames[ticker] = frame
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+def _same(snapshot: Optional[MarketSnapshot], expected: CandleSeries) -> bool:
+    if snapshot is None:
+        return False
+    candles = snapshot.candles
+    return (
+        np.array_equal(candles.timestamps, expected.timestamps)
+        and np.array_equal(candles.close, expected.close)
+        and np.array_equal(candles.volume, expected.volume)
+    )
+
+
+def check_yfinance_batches(symbols: int = 120, batch_size: int = 50) -> Dict[str, bool]:
+    """Chunking, frame splitting, missing tickers and incremental resume of ``fetch_many``."""
+    universe = stub_universe(symbols, days=3)
+    names = list(universe)
+    download = StubDownload(universe)
+    download.visible -= 5
+    download.missing = {names[-1]}
+    provider = YFinanceProvider(".JK", batch_size=batch_size, download=download)
+    chunks = -(-symbols // batch_size)
+    checks: Dict[str, bool] = {}
+
+    snapshots = provider.fetch_many(names)
+    checks["one download per chunk"] = len(download.calls) == chunks
+    checks["chunks within batch_size"] = all(
+        len(call["tickers"]) <= batch_size for call in download.calls
+    )
+    checks["first download uses a period"] = all("period" in call for call in download.calls)
+    checks["missing ticker left out"] = names[-1] not in snapshots
+    checks["frame split per symbol"] = all(
+        _same(snapshots.get(symbol), universe[symbol][: download.visible])
+        for symbol in names[:-1]
+    )
+
+    download.calls.clear()
+    download.visible += 5
+    snapshots = provider.fetch_many(names)
+    resumed = [call for call in download.calls if "start" in call]
+    checks["later polls resume from the cache"] = len(resumed) == chunks
+    checks["resumed bars merged"] = all(
+        _same(snapshots.get(symbol), universe[symbol][: download.visible])
+        for symbol in names[:-1]
+    )
+
+    download.calls.clear()
+    results, errors = run_screening(provider, names, compile_filters("price > 0"))
+    # The missing ticker has nothing cached, so its chunk also makes one full download.
+    resumed = [call for call in download.calls if "start" in call]
+    checks["run_screening takes the batch path"] = len(resumed) == chunks
+    checks["run_screening reports the missing ticker"] = (
+        len(results) == symbols - 1 and any(error.startswith(names[-1]) for error in errors)
+    )
+
+    shallow = YFinanceProvider(".JK", batch_size=batch_size, download=StubDownload(universe))
+    snapshots = shallow.fetch_many(names, lookback=2)
+    checks["lookback bounds the kept history"] = all(
+        len(snapshot.candles) == 2 for snapshot in snapshots.values()
+    )
+    return checks
+
+
+class _ChartEndpoint:
+    """Serves the first ``visible`` bars of each series as chart JSON, gzipped when asked.
+
+    ``period1`` trims the answer to later bars; symbols in ``gone`` answer
+    404 and symbols in ``down`` answer 503.
+    """
+
+    def __init__(self, universe: Dict[str, CandleSeries], suffix: str = ".JK") -> None:
+        self.universe = universe
+        self.suffix = suffix
+        self.visible = min(len(series) for series in universe.values())
+        self.gone: set = set()
+        self.down: set = set()
+
+    def __call__(self, path: str, headers: Dict[str, str]) -> Response:
+        url = urlsplit(path)
+        symbol = url.path.rsplit("/", 1)[-1][: -len(self.suffix)]
+        if symbol in self.down:
+            return 503, {}, b""
+        if symbol in self.gone or symbol not in self.universe:
+            return 404, {}, b""
+        series = self.universe[symbol][: self.visible]
+        seconds = series.timestamps // 1_000_000_000
+        period1 = parse_qs(url.query).get("period1")
+        keep = seconds >= int(period1[0]) if period1 else np.ones(len(series), dtype=bool)
+        quote = {
+            name: getattr(series, name)[keep].tolist()
+            for name in ("open", "high", "low", "close", "volume")
+        }
+        result = {"timestamp": seconds[keep].tolist(), "indicators": {"quote": [quote]}}
+        body = json.dumps({"chart": {"result": [result], "error": None}}).encode("utf-8")
+        response_headers = {"Content-Type": "application/json"}
+        if "gzip" in headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            response_headers["Content-Encoding"] = "gzip"
+        return 200, response_headers, body
+
+
+def check_chart_api(symbols: int = 40) -> Dict[str, bool]:
+    """Pooled requests, resume, error mapping and client lifetime of ``ChartApiProvider``."""
+    universe = stub_universe(symbols + 2, days=2)
+    names = list(universe)[:symbols]
+    gone, down = list(universe)[symbols:]
+    endpoint = _ChartEndpoint(universe)
+    endpoint.visible -= 5
+    endpoint.gone, endpoint.down = {gone}, {down}
+    checks: Dict[str, bool] = {}
+    with StandInServer(endpoint) as server:
+        provider = ChartApiProvider(".JK", base_url=server.url, concurrency=4)
+        merge_threads: set = set()
+        merge = provider.cache.merge
+
+        def recording_merge(*args: Any, **kwargs: Any) -> CandleSeries:
+            merge_threads.add(threading.get_ident())
+            return merge(*args, **kwargs)
+
+        provider.cache.merge = recording_merge  # type: ignore[method-assign]
+
+        async def fetch_all(lookback: Optional[int] = None) -> Dict[str, Any]:
+            outcomes = await asyncio.gather(
+                *(provider.fetch_async(symbol, lookback) for symbol in names + [gone, down]),
+                return_exceptions=True,
+            )
+            return {
+                "outcomes": dict(zip(names + [gone, down], outcomes)),
+                "loop_thread": threading.get_ident(),
+                "client": provider._client,
+            }
+
+        first = asyncio.run(fetch_all())
+        outcomes = first["outcomes"]
+        checks["bars parsed from gzipped JSON"] = all(
+            _same(outcomes[symbol], universe[symbol][: endpoint.visible]) for symbol in names
+        )
+        checks["gzip requested"] = all(
+            "gzip" in headers.get("Accept-Encoding", "") for _, headers in server.requests
+        )
+        checks["connections pooled"] = server.connections <= provider.concurrency
+        checks["404 is no data"] = isinstance(outcomes[gone], NoDataError)
+        checks["503 is a transient upstream error"] = isinstance(outcomes[down], UpstreamError)
+        checks["merge runs off the event loop"] = (
+            bool(merge_threads) and first["loop_thread"] not in merge_threads
+        )
+        checks["client closed with its loop"] = first["client"].is_closed
+
+        server.requests.clear()
+        endpoint.visible += 5
+        second = asyncio.run(fetch_all())
+        resumed = [path for path, _ in server.requests if "period1=" in path]
+        checks["later requests resume with period1"] = len(resumed) == len(names)
+        checks["resumed bars merged"] = all(
+            _same(second["outcomes"][symbol], universe[symbol]) for symbol in names
+        )
+        checks["new loop gets a new client"] = second["client"] is not first["client"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = CandleStore(directory)
+            for symbol in names:
+                store.append(symbol, universe[symbol])
+            provider = ChartApiProvider(
+                ".JK", base_url=server.url, cache=CandleCache(store=store)
+            )
+            load_threads: set = set()
+            load = store.load
+
+            def recording_load(*args: Any, **kwargs: Any) -> CandleSeries:
+                load_threads.add(threading.get_ident())
+                return load(*args, **kwargs)
+
+            store.load = recording_load  # type: ignore[method-assign]
+            server.requests.clear()
+            # The stored bars cover a 100-bar plan, so nothing is downloaded in full.
+            cold = asyncio.run(fetch_all(lookback=100))
+            resumed = [path for path, _ in server.requests if "period1=" in path]
+            checks["cold start resumes from the store"] = len(resumed) == len(names)
+            checks["store reads run off the event loop"] = (
+                bool(load_threads) and cold["loop_thread"] not in load_threads
+            )
+    return checks
+
+
+def _report(title: str, checks: Dict[str, bool]) -> bool:
+    print(title)
+    for name, passed in checks.items():
+        print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+    return all(checks.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=120)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    passed = _report(
+        "YFinanceProvider.fetch_many with a stubbed download:",
+        check_yfinance_batches(args.symbols, args.batch_size),
+    )
+    if importlib.util.find_spec("httpx") is None:
+        print("ChartApiProvider: skipped, httpx is not installed.")
+    else:
+        passed = _report(
+            "ChartApiProvider against a local HTTP stand-in:", check_chart_api()
+        ) and passed
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Screening benchmark over a synthetic full-BEI universe.
+
+Run from the repository root::
+
+    python -m benchmarks.screening --output bench_results.json
+    python -m benchmarks.screening --compare bench_results.json
+
+Results (throughput, p50/p99/mean latency per case) are written as JSON keyed
+by case name, together with the git commit, so runs can be diffed across
+commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.universe import LatencyProvider, synthetic_universe
+from bot.config import load_settings
+from bot.core.engine import run_screening
+from bot.core.filters import compile_filters, evaluate_filters
+from bot.core.market_data import MarketSnapshot
+from bot.core.tickers import TickerSource, TickerUniverse, load_tickers
+
+FIELD_FAMILIES = {
+    "ma": "close > ma20",
+    "ema": "close > ema20",
+    "rsi": "rsi < 30",
+    "roc": "roc14 > 1",
+    "adx": "adx > 25",
+    "macd": "macdh > 0",
+}
+END_TO_END_FILTER = "gain > 0.5 + vol > ma20vol + rsi < 70"
+
+
+def _stats(samples: List[float], items: int = 1) -> Dict[str, float]:
+    timings = np.asarray(samples)
+    total = float(timings.sum())
+    return {
+        "count": len(samples),
+        "throughput_per_s": items * len(samples) / total if total > 0 else float("inf"),
+        "p50_ms": float(np.percentile(timings, 50) * 1e3),
+        "p99_ms": float(np.percentile(timings, 99) * 1e3),
+        "mean_ms": float(timings.mean() * 1e3),
+    }
+
+
+def _time(func: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_field_families(universe: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Per-symbol ``evaluate_filters`` latency for each indicator family."""
+    snapshots = [MarketSnapshot(symbol, candles) for symbol, candles in universe.items()]
+    results = {}
+    for family, text in FIELD_FAMILIES.items():
+        plan = compile_filters(text)
+        samples: List[float] = []
+        for _ in range(repeat):
+            for snapshot in snapshots:
+                started = time.perf_counter()
+                evaluate_filters(plan, snapshot)
+                samples.append(time.perf_counter() - started)
+        results[f"evaluate_filters[{family}]"] = _stats(samples)
+    return results
+
+
+def bench_run_screening(
+    universe: Dict[str, Any],
+    repeat: int,
+    latency: float,
+    batch_size: int,
+) -> Dict[str, Dict[str, float]]:
+    symbols = list(universe)
+    plan = compile_filters(END_TO_END_FILTER)
+    results = {}
+    for label, size in (("per_symbol", 1), ("batch", batch_size)):
+        provider = LatencyProvider(universe, latency=latency, batch_size=size)
+        samples = _time(lambda: run_screening(provider, symbols, plan), repeat)
+        results[f"run_screening[{label}]"] = _stats(samples, items=len(symbols))
+    return results
+
+
+def bench_ticker_loading(symbols: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+        handle.write("\n".join(symbols))
+        path = handle.name
+    try:
+        source = TickerSource(file_path=path, url="", url_token="")
+        cached = TickerUniverse(source)
+        return {
+            "load_tickers[file]": _stats(_time(lambda: load_tickers(source), repeat * 10)),
+            "ticker_universe[cached]": _stats(_time(cached.get, repeat * 10)),
+        }
+    finally:
+        os.unlink(path)
+
+
+class _Message:
+    chat_id = 0
+
+    def __init__(self) -> None:
+        self.replies: List[str] = []
+
+    async def reply_text(self, text: str) -> None:
+        self.replies.append(text)
+
+
+def bench_run_once(
+    universe: Dict[str, Any],
+    repeat: int,
+    latency: float,
+    batch_size: int,
+) -> Dict[str, Dict[str, float]]:
+    """End-to-end ``TelegramBot._run_once`` with a fake chat message."""
+    from bot.telegram_bot import TelegramBot
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+        handle.write("\n".join(universe))
+        path = handle.name
+    settings = replace(
+        load_settings(),
+        bei_tickers_file=path,
+        bei_tickers_url="",
+        candle_store_dir="",
+        market_hours_only=False,
+        screening_shards=1,
+    )
+    provider = LatencyProvider(universe, latency=latency, batch_size=batch_size)
+    bot = TelegramBot(settings, provider=provider)
+
+    async def run() -> List[float]:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await bot._run_once(_Message(), END_TO_END_FILTER)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    try:
+        samples = asyncio.run(run())
+    finally:
+        bot.engine.close()
+        os.unlink(path)
+    return {"run_once[end_to_end]": _stats(samples, items=len(universe))}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(
+    symbols: int = 900,
+    days: int = 7,
+    repeat: int = 3,
+    latency: float = 0.0,
+    batch_size: int = 50,
+    seed: int = 7,
+) -> Dict[str, Any]:
+    universe = synthetic_universe(symbols, days, seed)
+    cases: Dict[str, Dict[str, float]] = {}
+    cases.update(bench_field_families(universe, repeat))
+    cases.update(bench_run_screening(universe, repeat, latency, batch_size))
+    cases.update(bench_ticker_loading(list(universe), repeat))
+    cases.update(bench_run_once(universe, repeat, latency, batch_size))
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": {
+            "symbols": symbols,
+            "days": days,
+            "bars": len(next(iter(universe.values()))),
+            "repeat": repeat,
+            "latency_s": latency,
+            "batch_size": batch_size,
+            "seed": seed,
+        },
+        "cases": cases,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = [f"{baseline.get('commit', '?')} -> {current.get('commit', '?')} (p50 ms)"]
+    for name, stats in current["cases"].items():
+        before: Optional[Dict[str, float]] = baseline.get("cases", {}).get(name)
+        if before is None:
+            lines.append(f"  {name:<32} {stats['p50_ms']:10.3f}   (new)")
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        lines.append(
+            f"  {name:<32} {before['p50_ms']:10.3f} -> {stats['p50_ms']:10.3f}   x{ratio:.2f}"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=900)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per upstream call")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    report = run_suite(
+        args.symbols, args.days, args.repeat, args.latency, args.batch_size, args.seed
+    )
+    for name, stats in report["cases"].items():
+        print(
+            f"{name:<32} p50 {stats['p50_ms']:10.3f} ms   p99 {stats['p99_ms']:10.3f} ms   "
+            f"{stats['throughput_per_s']:12,.1f}/s"
+        )
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            print("\n".join(compare(report, json.load(handle))))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Local HTTP stand-in server for offline checks of the network code paths."""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from typing import Callable, Dict, List, Tuple
+
+Response = Tuple[int, Dict[str, str], bytes]
+Route = Callable[[str, Dict[str, str]], Response]
+
+
+class StandInServer:
+    """Threaded keep-alive HTTP/1.1 server on 127.0.0.1 answering GETs from ``route``.
+
+    ``route(path, headers)`` returns ``(status, headers, body)``. Every request
+    is recorded as ``(path, headers)``, and ``connections`` counts accepted
+    TCP connections so connection reuse can be checked. Use as a context
+    manager.
+    """
+
+    def __init__(self, route: Route) -> None:
+        self.route = route
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                headers = dict(self.headers.items())
+                with stand_in._lock:
+                    stand_in.requests.append((self.path, headers))
+                status, response_headers, body = stand_in.route(self.path, headers)
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,122 @@
+"""Offline checks of the cached ticker universe against a local HTTP stand-in.
+
+Run from the repository root::
+
+    python -m benchmarks.tickers
+
+Each check prints ``ok`` or ``FAIL``; the exit status is non-zero if any failed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks.standin import Response, StandInServer
+from bot.core.tickers import TickerSource, TickerUniverse
+
+
+class _TickerEndpoint:
+    """Serves ``tickers`` as JSON with an ETag, answering ``If-None-Match`` with 304."""
+
+    def __init__(self, tickers: List[str]) -> None:
+        self.tickers = tickers
+        self.version = 1
+        self.down = False
+
+    def publish(self, tickers: List[str]) -> None:
+        self.tickers = tickers
+        self.version += 1
+
+    def __call__(self, path: str, headers: Dict[str, str]) -> Response:
+        if self.down:
+            return 503, {}, b""
+        etag = f'"v{self.version}"'
+        if headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        body = json.dumps({"tickers": self.tickers}).encode("utf-8")
+        return 200, {"ETag": etag, "Content-Type": "application/json"}, body
+
+
+def check_remote_universe() -> Dict[str, bool]:
+    """TTL caching, conditional revalidation, updates and outages of a remote list."""
+    endpoint = _TickerEndpoint(["bbca", "BBRI"])
+    now = [0.0]
+    checks: Dict[str, bool] = {}
+    with StandInServer(endpoint) as server:
+        source = TickerSource(file_path="", url=f"{server.url}/bei.json", url_token="secret")
+        universe = TickerUniverse(source, ttl=60, clock=lambda: now[0])
+
+        checks["first load parses the list"] = universe.get() == ["BBCA", "BBRI"]
+        checks["token sent as bearer"] = (
+            server.requests[-1][1].get("Authorization") == "Bearer secret"
+        )
+        universe.get()
+        checks["no request within the TTL"] = len(server.requests) == 1
+
+        now[0] = 61
+        checks["unchanged list kept on 304"] = universe.get() == ["BBCA", "BBRI"]
+        checks["revalidation is conditional"] = (
+            len(server.requests) == 2 and server.requests[-1][1].get("If-None-Match") == '"v1"'
+        )
+
+        endpoint.publish(["BBCA", "BBRI", "TLKM"])
+        now[0] = 122
+        checks["new list served after the TTL"] = universe.get() == ["BBCA", "BBRI", "TLKM"]
+
+        endpoint.down = True
+        now[0] = 183
+        checks["last good list kept while down"] = universe.get() == ["BBCA", "BBRI", "TLKM"]
+
+        cold = TickerUniverse(source)
+        try:
+            cold.get()
+        except Exception:  # noqa: BLE001 - any failure is what is expected here
+            checks["first load failure raises"] = True
+        else:
+            checks["first load failure raises"] = False
+    return checks
+
+
+def check_file_universe() -> Dict[str, bool]:
+    """A local file is re-read only when its mtime changes."""
+    checks: Dict[str, bool] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bei_tickers.txt")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("bbca\n# comment\nbbri\n")
+        os.utime(path, (1_000, 1_000))
+        universe = TickerUniverse(TickerSource(file_path=path, url="", url_token=""))
+        checks["file parsed"] = universe.get() == ["BBCA", "BBRI"]
+
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("tlkm\n")
+        os.utime(path, (1_000, 1_000))
+        checks["same mtime keeps the cached list"] = universe.get() == ["BBCA", "BBRI"]
+
+        os.utime(path, (2_000, 2_000))
+        checks["new mtime re-reads the file"] = universe.get() == ["TLKM"]
+
+        os.remove(path)
+        checks["missing file keeps the last list"] = universe.get() == ["TLKM"]
+    return checks
+
+
+def _report(title: str, checks: Dict[str, bool]) -> bool:
+    print(title)
+    for name, passed in checks.items():
+        print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+    return all(checks.values())
+
+
+def main() -> None:
+    remote = _report("TickerUniverse against a local HTTP stand-in:", check_remote_universe())
+    local = _report("TickerUniverse on a local file:", check_file_universe())
+    sys.exit(0 if remote and local else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Synthetic BEI-sized universe and a latency-simulating provider for benchmarks."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from bot.core.market_data import MarketDataProvider, MarketSnapshot, NoDataError
+from bot.core.market_hours import WIB, MarketCalendar
+from bot.core.series import CandleSeries
+
+_NS_PER_MINUTE = 60_000_000_000
+
+
+def _ns(moment: datetime) -> int:
+    return int(moment.timestamp()) * 1_000_000_000
+
+
+def session_timestamps(days: int, end: date = date(2026, 10, 16)) -> np.ndarray:
+    """1m bar opens for the last ``days`` IDX trading days up to ``end``, in ns UTC."""
+    calendar = MarketCalendar()
+    trading_days: List[np.ndarray] = []
+    day = end
+    while len(trading_days) < days:
+        sessions = [
+            np.arange(
+                _ns(datetime.combine(day, session.start, tzinfo=WIB)),
+                _ns(datetime.combine(day, session.end, tzinfo=WIB)),
+                _NS_PER_MINUTE,
+            )
+            for session in calendar.sessions(day)
+            if session.polling
+        ]
+        if sessions:
+            trading_days.append(np.concatenate(sessions))
+        day -= timedelta(days=1)
+    trading_days.reverse()
+    return np.concatenate(trading_days) if trading_days else np.empty(0, dtype=np.int64)
+
+
+def synthetic_series(timestamps: np.ndarray, rng: np.random.Generator) -> CandleSeries:
+    bars = len(timestamps)
+    start = rng.uniform(50, 10_000)
+    volatility = rng.uniform(0.0005, 0.004)
+    close = start * np.exp(np.cumsum(rng.normal(0, volatility, bars)))
+    spread = np.abs(rng.normal(0, volatility, bars)) * close
+    liquidity = rng.lognormal(8, 2)
+    volume = np.round(rng.lognormal(0, 1, bars) * liquidity) * (rng.random(bars) > 0.2)
+    return CandleSeries(
+        timestamps=timestamps.astype(np.int64),
+        open=close + rng.normal(0, volatility / 2, bars) * close,
+        high=close + spread,
+        low=close - spread,
+        close=close,
+        volume=volume.astype(float),
+    )
+
+
+def synthetic_symbols(count: int) -> List[str]:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = []
+    for index in range(count):
+        code = ""
+        value = index
+        for _ in range(4):
+            code = letters[value % 26] + code
+            value //= 26
+        symbols.append(code)
+    return symbols
+
+
+def synthetic_universe(
+    symbols: int = 900,
+    days: int = 7,
+    seed: int = 7,
+) -> Dict[str, CandleSeries]:
+    """Random-walk OHLCV for ``symbols`` tickers over ``days`` trading days; reproducible."""
+    rng = np.random.default_rng(seed)
+    timestamps = session_timestamps(days)
+    return {symbol: synthetic_series(timestamps, rng) for symbol in synthetic_symbols(symbols)}
+
+
+class LatencyProvider(MarketDataProvider):
+    """Serve a synthetic universe with simulated network latency.
+
+    ``latency`` is slept per ``fetch`` and per ``fetch_many`` call (plus
+    ``per_symbol`` seconds per requested symbol), so both the per-symbol and
+    the batch code paths can be timed against a realistic upstream.
+    """
+
+    def __init__(
+        self,
+        universe: Dict[str, CandleSeries],
+        latency: float = 0.0,
+        per_symbol: float = 0.0,
+        batch_size: int = 1,
+        missing: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.universe = universe
+        self.latency = latency
+        self.per_symbol = per_symbol
+        self.batch_size = max(1, batch_size)
+        self.supports_batch = batch_size > 1
+        self.missing = set(missing or ())
+        self.calls = 0
+
+    def _sleep(self, symbols: int) -> None:
+        delay = self.latency + self.per_symbol * symbols
+        if delay > 0:
+            time.sleep(delay)
+
+    def fetch(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        self.calls += 1
+        self._sleep(1)
+        candles = self.universe.get(symbol)
+        if candles is None or symbol in self.missing:
+            raise NoDataError(f"No data returned for {symbol}.")
+        return MarketSnapshot(symbol=symbol, candles=candles)
+
+    def fetch_many(
+        self, symbols: Sequence[str], lookback: Optional[int] = None
+    ) -> Dict[str, MarketSnapshot]:
+        self.calls += 1
+        self._sleep(len(symbols))
+        return {
+            symbol: MarketSnapshot(symbol=symbol, candles=self.universe[symbol])
+            for symbol in symbols
+            if symbol in self.universe and symbol not in self.missing
+        }
@@ -11,7 +11,28 @@ class Settings:
     bei_tickers_url: str
     bei_tickers_url_token: str
     poll_interval_seconds: int
+    symbol_poll_interval_seconds: float
     yfinance_suffix: str
+    screening_concurrency: int
+    screening_shards: int
+    fetch_timeout_seconds: float
+    yfinance_batch_size: int
+    market_data_provider: str
+    chart_api_url: str
+    candle_store_dir: str
+    ema_warmup_bars: int
+    tickers_ttl_seconds: float
+    market_hours_only: bool
+    idx_holidays_file: str
+    poll_settle_seconds: float
+    fetch_budget: int
+    poll_max_backoff_ticks: int
+    alert_proximity_pct: float
+    failure_cooldown_seconds: float
+    no_data_cooldown_seconds: float
+    telegram_global_rate: float
+    telegram_chat_rate: float
+    metrics_file: str
 
 
 def load_settings() -> Settings:
@@ -20,12 +41,56 @@ def load_settings() -> Settings:
     tickers_url = os.getenv("BEI_TICKERS_URL", "")
     tickers_url_token = os.getenv("BEI_TICKERS_URL_TOKEN", "")
     poll_interval = int(os.getenv("POLL_INTERVAL_SECONDS", "15"))
+    symbol_poll_interval = float(os.getenv("SYMBOL_POLL_INTERVAL_SECONDS", "5"))
     yfinance_suffix = os.getenv("YFINANCE_SUFFIX", ".JK")
+    screening_concurrency = int(os.getenv("SCREENING_CONCURRENCY", "16"))
+    screening_shards = int(os.getenv("SCREENING_SHARDS", "1"))
+    fetch_timeout = float(os.getenv("FETCH_TIMEOUT_SECONDS", "20"))
+    yfinance_batch_size = int(os.getenv("YFINANCE_BATCH_SIZE", "50"))
+    market_data_provider = os.getenv("MARKET_DATA_PROVIDER", "yfinance").strip().lower()
+    chart_api_url = os.getenv(
+        "CHART_API_URL", "https://query1.finance.yahoo.com/v8/finance/chart"
+    )
+    candle_store_dir = os.getenv("CANDLE_STORE_DIR", "data/candles")
+    ema_warmup_bars = int(os.getenv("EMA_WARMUP_BARS", "200"))
+    tickers_ttl = float(os.getenv("TICKERS_TTL_SECONDS", "300"))
+    market_hours_only = os.getenv("MARKET_HOURS_ONLY", "true").lower() in {"1", "true", "yes"}
+    idx_holidays_file = os.getenv("IDX_HOLIDAYS_FILE", "data/idx_holidays.txt")
+    poll_settle = float(os.getenv("POLL_SETTLE_SECONDS", "2"))
+    fetch_budget = int(os.getenv("FETCH_BUDGET", "0"))
+    poll_max_backoff = int(os.getenv("POLL_MAX_BACKOFF_TICKS", "8"))
+    alert_proximity = float(os.getenv("ALERT_PROXIMITY_PCT", "2"))
+    failure_cooldown = float(os.getenv("FAILURE_COOLDOWN_SECONDS", "30"))
+    no_data_cooldown = float(os.getenv("NO_DATA_COOLDOWN_SECONDS", "900"))
+    telegram_global_rate = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+    telegram_chat_rate = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+    metrics_file = os.getenv("METRICS_FILE", "")
     return Settings(
         telegram_bot_token=token,
         bei_tickers_file=tickers_file,
         bei_tickers_url=tickers_url,
         bei_tickers_url_token=tickers_url_token,
         poll_interval_seconds=poll_interval,
+        symbol_poll_interval_seconds=symbol_poll_interval,
         yfinance_suffix=yfinance_suffix,
+        screening_concurrency=screening_concurrency,
+        screening_shards=screening_shards,
+        fetch_timeout_seconds=fetch_timeout,
+        yfinance_batch_size=yfinance_batch_size,
+        market_data_provider=market_data_provider,
+        chart_api_url=chart_api_url,
+        candle_store_dir=candle_store_dir,
+        ema_warmup_bars=ema_warmup_bars,
+        tickers_ttl_seconds=tickers_ttl,
+        market_hours_only=market_hours_only,
+        idx_holidays_file=idx_holidays_file,
+        poll_settle_seconds=poll_settle,
+        fetch_budget=fetch_budget,
+        poll_max_backoff_ticks=poll_max_backoff,
+        alert_proximity_pct=alert_proximity,
+        failure_cooldown_seconds=failure_cooldown,
+        no_data_cooldown_seconds=no_data_cooldown,
+        telegram_global_rate=telegram_global_rate,
+        telegram_chat_rate=telegram_chat_rate,
+        metrics_file=metrics_file,
     )
@@ -0,0 +1,181 @@
+"""Replay a filter over stored candles to see when it would have fired.
+
+Run from the repository root::
+
+    python -m bot.core.backtest "gain > 3 + vol > ma20vol" --start 2026-10-12 --end 2026-10-17
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+import os
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+
+from bot.core.candle_store import CandleStore
+from bot.core.filters import (
+    FieldRef,
+    FilterCondition,
+    FilterPlan,
+    compile_conditions,
+    compile_filters,
+    field_series,
+)
+from bot.core.market_data import MarketDataProvider
+from bot.core.market_hours import WIB
+from bot.core.series import CandleSeries
+from bot.core.streaming import IndicatorKey
+
+Timestamp = Union[int, datetime, None]
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    symbol: str
+    bars: int
+    triggers: np.ndarray
+
+    @property
+    def first(self) -> Optional[int]:
+        return int(self.triggers[0]) if len(self.triggers) else None
+
+
+def _to_ns(moment: Timestamp) -> Optional[int]:
+    if moment is None or isinstance(moment, int):
+        return moment
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=WIB)
+    return int(moment.timestamp() * 1_000_000_000)
+
+
+def _plan(conditions: Union[str, FilterPlan, List[FilterCondition]]) -> FilterPlan:
+    if isinstance(conditions, str):
+        return compile_filters(conditions)
+    return compile_conditions(conditions)
+
+
+def passing_mask(plan: FilterPlan, candles: CandleSeries) -> np.ndarray:
+    """Per-bar result of ``plan.evaluate`` on each prefix of ``candles``, in one pass."""
+    cache: Dict[IndicatorKey, object] = {}
+    columns: Dict[str, np.ndarray] = {}
+
+    def lookup(ref: FieldRef) -> np.ndarray:
+        column = columns.get(ref.name)
+        if column is None:
+            column = columns[ref.name] = field_series(ref, candles, cache)
+        return column
+
+    passed = np.ones(len(candles), dtype=bool)
+    for predicate in plan.predicates:
+        if not passed.any():
+            break
+        passed &= np.broadcast_to(predicate.test(lookup), passed.shape)
+    return passed
+
+
+def replay_series(
+    conditions: Union[str, FilterPlan, List[FilterCondition]],
+    candles: CandleSeries,
+    start: Timestamp = None,
+    end: Timestamp = None,
+    symbol: str = "",
+) -> ReplayResult:
+    """Bars in ``[start, end)`` where the plan starts passing (rising edges).
+
+    Earlier bars only warm indicators up; the plan counts as not passing right
+    before ``start``, like a freshly started ``/algo``.
+    """
+    plan = _plan(conditions)
+    timestamps = candles.timestamps
+    first = 0 if start is None else int(np.searchsorted(timestamps, _to_ns(start)))
+    last = len(candles) if end is None else int(np.searchsorted(timestamps, _to_ns(end)))
+    if first >= last:
+        return ReplayResult(symbol=symbol, bars=0, triggers=np.empty(0, dtype=np.int64))
+    mask = passing_mask(plan, candles[:last])[first:]
+    rising = mask & ~np.concatenate(([False], mask[:-1]))
+    return ReplayResult(
+        symbol=symbol, bars=last - first, triggers=timestamps[first:last][rising]
+    )
+
+
+def replay(
+    conditions: Union[str, FilterPlan, List[FilterCondition]],
+    universe: Mapping[str, CandleSeries],
+    start: Timestamp = None,
+    end: Timestamp = None,
+) -> List[ReplayResult]:
+    plan = _plan(conditions)
+    return [
+        replay_series(plan, candles, start, end, symbol=symbol)
+        for symbol, candles in universe.items()
+    ]
+
+
+def replay_provider(
+    conditions: Union[str, FilterPlan, List[FilterCondition]],
+    provider: MarketDataProvider,
+    symbols: Iterable[str],
+    start: Timestamp = None,
+    end: Timestamp = None,
+) -> List[ReplayResult]:
+    """Replay against whatever history ``provider`` returns, e.g. a ``MockProvider``."""
+    universe = {symbol: provider.fetch(symbol).candles for symbol in symbols}
+    return replay(conditions, universe, start, end)
+
+
+def load_store(
+    store: CandleStore,
+    symbols: Optional[Iterable[str]] = None,
+) -> Dict[str, CandleSeries]:
+    if symbols is None:
+        symbols = sorted(
+            name[: -len(".bin")] for name in os.listdir(store.root) if name.endswith(".bin")
+        )
+    universe: Dict[str, CandleSeries] = {}
+    for symbol in symbols:
+        series = store.load(symbol)
+        if series:
+            universe[symbol] = series
+    return universe
+
+
+def _format_time(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1e9, tz=WIB).strftime("%Y-%m-%d %H:%M")
+
+
+def summarize(results: List[ReplayResult]) -> str:
+    fired = [result for result in results if len(result.triggers)]
+    lines = [
+        f"{len(fired)}/{len(results)} ticker terpicu, "
+        f"{sum(len(result.triggers) for result in fired)} trigger total."
+    ]
+    for result in sorted(fired, key=lambda item: item.first or 0):
+        times = ", ".join(_format_time(int(ts)) for ts in result.triggers[:5])
+        more = f" (+{len(result.triggers) - 5})" if len(result.triggers) > 5 else ""
+        lines.append(f"{result.symbol}: {times}{more}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("filters")
+    parser.add_argument("--store", default=os.getenv("CANDLE_STORE_DIR", "data/candles"))
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--symbols", nargs="*")
+    args = parser.parse_args()
+
+    universe = load_store(CandleStore(args.store), args.symbols)
+    started = time.perf_counter()
+    results = replay(args.filters, universe, args.start, args.end)
+    elapsed = time.perf_counter() - started
+    print(summarize(results))
+    print(f"Replay {len(universe)} ticker dalam {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
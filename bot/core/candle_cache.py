@@ -0,0 +1,203 @@
+"""Per-symbol candle cache so polls only download the newest bars."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from bot.core.candle_store import CandleStore
+from bot.core.series import CandleRing, CandleSeries
+
+_NS_PER_DAY = 86_400_000_000_000
+# 1m bars in one IDX trading day (both sessions), rounded up.
+BARS_PER_DAY = 330
+
+
+@dataclass
+class CacheEntry:
+    ring: CandleRing
+    series: CandleSeries
+    last_used: float
+    demand: int
+    deep_used: float
+    # Newest bars held without a hole: the depth a full download asked for, or
+    # the bars read back from the store. Only this much history can be resumed.
+    complete: int
+
+
+class CandleCache:
+    """Keep recent OHLCV history per symbol and merge incremental tails into it.
+
+    Each symbol's bars live in a ``CandleRing`` sized to the lookback its last
+    request asked for, capped at ``window_days`` of bars. A deeper request
+    grows the ring at once; a ring is shrunk back to its latest demand once no
+    request has needed its full depth for ``max_idle_seconds``.
+
+    With a ``store`` the cache is backed by disk: a symbol missing from memory is
+    loaded from the store first, and every closed bar downloaded is appended to
+    it on merge. A full download that does not reach back to the held bars
+    replaces the stored file instead, so the store never holds a hole.
+    """
+
+    def __init__(
+        self,
+        window_days: int = 7,
+        max_idle_seconds: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[CandleStore] = None,
+    ) -> None:
+        self.window_days = window_days
+        self.max_idle_seconds = max_idle_seconds
+        self.clock = clock
+        self.store = store
+        self.capacity = window_days * BARS_PER_DAY
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = clock()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.ring.nbytes for entry in list(self._entries.values()))
+
+    def depth(self, lookback: Optional[int] = None) -> int:
+        """Bars kept for a request needing ``lookback`` bars; ``None`` means the whole window."""
+        if lookback is None:
+            return self.capacity
+        # Two bars at least, so the still-forming bar can be replaced on merge.
+        return min(self.capacity, max(2, lookback))
+
+    def days(self, lookback: Optional[int] = None) -> int:
+        """Trading days to download for ``lookback`` bars, plus the current session."""
+        return min(self.window_days, -(-self.depth(lookback) // BARS_PER_DAY) + 1)
+
+    def _new_entry(
+        self, series: CandleSeries, depth: int, now: float, complete: int
+    ) -> CacheEntry:
+        ring = CandleRing(depth)
+        ring.extend(series)
+        return CacheEntry(
+            ring=ring,
+            series=ring.series(),
+            last_used=now,
+            demand=depth,
+            deep_used=now,
+            complete=min(complete, depth),
+        )
+
+    def _entry(self, symbol: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(symbol)
+        if entry is not None or self.store is None:
+            return entry
+        last = self.store.last_timestamp(symbol)
+        if last is None:
+            return None
+        series = self.store.load(symbol, since=last - self.window_days * _NS_PER_DAY)
+        if not series:
+            return None
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.setdefault(
+                symbol, self._new_entry(series, self.capacity, now, len(series))
+            )
+        return entry
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        entry = self._entry(symbol)
+        if entry is None:
+            return None
+        return entry.ring.last_timestamp
+
+    def covers(self, symbol: str, lookback: Optional[int] = None) -> bool:
+        """Whether enough contiguous history is held to resume with an incremental fetch."""
+        entry = self._entry(symbol)
+        return entry is not None and entry.complete >= self.depth(lookback)
+
+    def get(self, symbol: str) -> Optional[CandleSeries]:
+        entry = self._entry(symbol)
+        if entry is None:
+            return None
+        entry.last_used = self.clock()
+        return entry.series
+
+    def merge(
+        self,
+        symbol: str,
+        series: CandleSeries,
+        lookback: Optional[int] = None,
+        resumed: bool = False,
+    ) -> CandleSeries:
+        """Merge newly downloaded bars; the overlapping bar is replaced by the new one.
+
+        ``resumed`` marks a tail fetched from the last held bar; otherwise the
+        download covered everything ``lookback`` needs.
+        """
+        series = series.deduplicated()
+        depth = self.depth(lookback)
+        self._entry(symbol)
+        now = self.clock()
+        joined = True
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                entry = self._entries[symbol] = self._new_entry(series, depth, now, depth)
+            else:
+                last = entry.ring.last_timestamp
+                joined = resumed or (
+                    last is not None and len(series) and int(series.timestamps[0]) <= last
+                )
+                if depth > entry.ring.capacity:
+                    entry.ring.resize(depth)
+                entry.ring.extend(series)
+                entry.series = entry.ring.series()
+                entry.last_used = now
+                entry.demand = depth
+                if not resumed:
+                    entry.complete = depth
+                if depth >= entry.ring.capacity:
+                    entry.deep_used = now
+            merged = entry.series
+        if self.store is not None and len(series) > 1:
+            # The newest bar may still be forming; only closed bars are persisted.
+            if joined:
+                self.store.append(symbol, series[:-1])
+            else:
+                self.store.compact(symbol, series[:-1])
+        self._maybe_evict(now)
+        return merged
+
+    def evict(self, keep: Optional[set] = None) -> List[str]:
+        """Drop symbols outside ``keep`` or idle longer than ``max_idle_seconds``.
+
+        Rings whose full depth has gone unused that long are shrunk to their
+        latest demand.
+        """
+        now = self.clock()
+        with self._lock:
+            evicted = [
+                symbol
+                for symbol, entry in self._entries.items()
+                if (keep is not None and symbol not in keep)
+                or now - entry.last_used > self.max_idle_seconds
+            ]
+            for symbol in evicted:
+                del self._entries[symbol]
+            for entry in self._entries.values():
+                stale = now - entry.deep_used > self.max_idle_seconds
+                if stale and entry.demand < entry.ring.capacity:
+                    entry.ring.resize(entry.demand)
+                    entry.series = entry.ring.series()
+                    entry.complete = min(entry.complete, entry.demand)
+            self._last_eviction = now
+        return evicted
+
+    def _maybe_evict(self, now: float) -> None:
+        if now - self._last_eviction >= self.max_idle_seconds / 4:
+            self.evict()
@@ -0,0 +1,133 @@
+"""Append-only on-disk candle store for warm restarts."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from bot.core.series import CandleSeries
+
+RECORD = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+
+class CandleStore:
+    """One binary file of fixed-size OHLCV records per symbol under ``root``.
+
+    Only closed bars are appended, in time order, so files never need
+    de-duplication. Loading memory-maps the file and copies just the requested
+    tail, so startup touches only the pages it needs instead of parsing the
+    whole history. Writes to one symbol's file are serialised by a per-symbol
+    lock held from reading its last timestamp to the end of the write.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._last: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.bin")
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _records(self, path: str) -> int:
+        try:
+            return os.path.getsize(path) // RECORD.itemsize
+        except OSError:
+            return 0
+
+    def _read_last(self, symbol: str) -> Optional[int]:
+        path = self.path(symbol)
+        count = self._records(path)
+        if not count:
+            return None
+        with open(path, "rb") as handle:
+            handle.seek((count - 1) * RECORD.itemsize)
+            record = np.frombuffer(handle.read(RECORD.itemsize), dtype=RECORD)
+        return int(record["timestamp"][0])
+
+    def last_timestamp(self, symbol: str) -> Optional[int]:
+        with self._lock:
+            if symbol not in self._last:
+                self._last[symbol] = self._read_last(symbol)
+            return self._last[symbol]
+
+    def load(self, symbol: str, since: Optional[int] = None) -> Optional[CandleSeries]:
+        """Bars with timestamp >= ``since`` (all bars when ``None``)."""
+        path = self.path(symbol)
+        count = self._records(path)
+        if not count:
+            return None
+        records = np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+        try:
+            timestamps = records["timestamp"]
+            start = 0 if since is None else int(np.searchsorted(timestamps, since))
+            tail = records[start:]
+            series = CandleSeries(
+                timestamps=np.array(tail["timestamp"]),
+                open=np.array(tail["open"]),
+                high=np.array(tail["high"]),
+                low=np.array(tail["low"]),
+                close=np.array(tail["close"]),
+                volume=np.array(tail["volume"]),
+            )
+        finally:
+            del records
+        if start > len(series):
+            self.compact(symbol, series)
+        return series
+
+    def append(self, symbol: str, series: CandleSeries) -> int:
+        """Append bars newer than the last stored one; returns how many were written."""
+        with self._symbol_lock(symbol):
+            last = self.last_timestamp(symbol)
+            if last is not None:
+                series = series.since(last + 1)
+            if not len(series):
+                return 0
+            records = np.empty(len(series), dtype=RECORD)
+            records["timestamp"] = series.timestamps
+            records["open"] = series.open
+            records["high"] = series.high
+            records["low"] = series.low
+            records["close"] = series.close
+            records["volume"] = series.volume
+            with open(self.path(symbol), "ab") as handle:
+                size = handle.tell()
+                if size % RECORD.itemsize:
+                    handle.truncate(size - size % RECORD.itemsize)
+                    handle.seek(0, os.SEEK_END)
+                handle.write(records.tobytes())
+            with self._lock:
+                self._last[symbol] = int(series.timestamps[-1])
+        return len(series)
+
+    def compact(self, symbol: str, series: CandleSeries) -> None:
+        """Rewrite the file so it only holds ``series``."""
+        path = self.path(symbol)
+        temporary = f"{path}.tmp"
+        records = np.empty(len(series), dtype=RECORD)
+        for name in RECORD.names:
+            records[name] = getattr(series, "timestamps" if name == "timestamp" else name)
+        with self._symbol_lock(symbol):
+            with open(temporary, "wb") as handle:
+                handle.write(records.tobytes())
+            os.replace(temporary, path)
+            with self._lock:
+                self._last[symbol] = series.last_timestamp
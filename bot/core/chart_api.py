@@ -0,0 +1,226 @@
+"""Async market-data provider for the Yahoo-style chart JSON endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import importlib
+import importlib.util
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from bot.core.candle_cache import CandleCache
+from bot.core.market_data import (
+    MarketDataError,
+    MarketDataProvider,
+    MarketSnapshot,
+    NoDataError,
+    UpstreamError,
+)
+from bot.core.metrics import metrics
+from bot.core.series import CandleSeries
+
+DEFAULT_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart"
+_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) stock-bot"
+_QUOTE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def _column(values: Optional[List[Any]], length: int) -> np.ndarray:
+    if values is None:
+        return np.full(length, np.nan)
+    # ``None`` entries (bars without trades) become NaN.
+    return np.array(values, dtype=np.float64)
+
+
+def parse_chart(payload: bytes) -> CandleSeries:
+    """Chart JSON straight into columns; bars without a close are dropped."""
+    document = json.loads(payload)
+    chart = document.get("chart") or {}
+    error = chart.get("error")
+    if error:
+        raise NoDataError(error.get("description") or error.get("code") or str(error))
+    results = chart.get("result") or []
+    if not results or not results[0].get("timestamp"):
+        return CandleSeries.empty()
+    result = results[0]
+    timestamps = np.asarray(result["timestamp"], dtype=np.int64) * 1_000_000_000
+    quotes = (result.get("indicators", {}).get("quote") or [{}])[0]
+    columns = {name: _column(quotes.get(name), len(timestamps)) for name in _QUOTE_FIELDS}
+    keep = ~np.isnan(columns["close"])
+    if not keep.all():
+        timestamps = timestamps[keep]
+        columns = {name: values[keep] for name, values in columns.items()}
+    return CandleSeries(timestamps=timestamps, **columns)
+
+
+async def _client_scope(client: Any) -> AsyncIterator[None]:
+    """Suspended for the client's lifetime; closing it, or the loop shutting down, closes ``client``."""
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+class ChartApiProvider(MarketDataProvider):
+    """Fetch 1m bars over a pooled keep-alive ``httpx.AsyncClient``.
+
+    One request per symbol; ``concurrency`` bounds the open connections and
+    in-flight requests, and HTTP/2 multiplexing is used when ``h2`` is
+    installed. Responses are gzip-compressed and parsed without pandas, and a
+    first request asks only for the days ``lookback`` bars span.
+    The async engine awaits ``fetch_async`` directly on its event loop, and
+    parsing, cache merges and cold cache lookups (which may read the candle
+    store) run in a worker thread so they do not stall it;
+    the synchronous methods run a short-lived client for scripts and tests.
+    """
+
+    supports_batch = True
+    supports_async = True
+
+    def __init__(
+        self,
+        suffix: str,
+        base_url: str = DEFAULT_CHART_URL,
+        concurrency: int = 16,
+        timeout: float = 20.0,
+        batch_size: int = 100,
+        cache: Optional[CandleCache] = None,
+    ) -> None:
+        self.suffix = suffix
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.cache = cache if cache is not None else CandleCache()
+        self._client: Any = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client_scope: Optional[AsyncIterator[None]] = None
+        self._module: Any = None
+
+    def _httpx(self):
+        if self._module is None:
+            if importlib.util.find_spec("httpx") is None:
+                raise MarketDataError("httpx is not installed.")
+            self._module = importlib.import_module("httpx")
+        return self._module
+
+    def _new_client(self) -> Any:
+        httpx = self._httpx()
+        return httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+            timeout=httpx.Timeout(self.timeout, pool=None),
+            headers={"User-Agent": _USER_AGENT, "Accept-Encoding": "gzip"},
+        )
+
+    async def _get_client(self) -> Any:
+        """One pooled client per event loop; a client cannot be shared across loops.
+
+        Each client is closed on its own loop: by ``aclose``, or when that loop
+        shuts down its async generators (``asyncio.run`` does) after the
+        provider has moved on to another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            client = self._new_client()
+            scope = _client_scope(client)
+            await scope.__anext__()
+            self._client, self._client_loop, self._client_scope = client, loop, scope
+        return self._client
+
+    def _params(self, symbol: str, lookback: Optional[int] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"interval": "1m", "includePrePost": "false"}
+        last = self.cache.last_timestamp(symbol)
+        now = datetime.now(timezone.utc)
+        if last is not None and self.cache.covers(symbol, lookback):
+            resume = datetime.fromtimestamp(last / 1e9, tz=timezone.utc)
+            if now - resume < timedelta(days=self.cache.window_days):
+                params["period1"] = int(resume.timestamp())
+                params["period2"] = int(now.timestamp()) + 60
+                return params
+        params["range"] = f"{self.cache.days(lookback)}d"
+        return params
+
+    async def _request(
+        self, client: Any, symbol: str, lookback: Optional[int] = None
+    ) -> MarketSnapshot:
+        ticker = f"{symbol}{self.suffix}"
+        if symbol in self.cache:
+            params = self._params(symbol, lookback)
+        else:
+            # Not in memory yet: the lookup may read the symbol's file from the store.
+            params = await asyncio.to_thread(self._params, symbol, lookback)
+        started = time.perf_counter()
+        try:
+            response = await client.get(f"{self.base_url}/{ticker}", params=params)
+        except self._httpx().TransportError as exc:
+            raise UpstreamError(f"Request for {ticker} failed: {type(exc).__name__}.") from exc
+        metrics.observe("download", time.perf_counter() - started)
+        if response.status_code == 404:
+            raise NoDataError(f"No data returned for {ticker}.")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise UpstreamError(f"HTTP {response.status_code} for {ticker}.")
+        response.raise_for_status()
+        resumed = "period1" in params
+        return await asyncio.to_thread(
+            self._snapshot, symbol, response.content, resumed, lookback
+        )
+
+    def _snapshot(
+        self, symbol: str, payload: bytes, resumed: bool, lookback: Optional[int] = None
+    ) -> MarketSnapshot:
+        with metrics.time("convert"):
+            series = parse_chart(payload)
+        if not series:
+            cached = self.cache.get(symbol) if resumed else None
+            if cached:
+                return MarketSnapshot(symbol=symbol, candles=cached)
+            raise NoDataError(f"No data returned for {symbol}{self.suffix}.")
+        merged = self.cache.merge(symbol, series, lookback, resumed=resumed)
+        return MarketSnapshot(symbol=symbol, candles=merged)
+
+    async def fetch_async(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        return await self._request(await self._get_client(), symbol, lookback)
+
+    async def _fetch_all(
+        self, symbols: Sequence[str], lookback: Optional[int] = None
+    ) -> Dict[str, MarketSnapshot]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._new_client() as client:
+
+            async def fetch_one(symbol: str) -> Optional[MarketSnapshot]:
+                async with semaphore:
+                    try:
+                        return await self._request(client, symbol, lookback)
+                    except MarketDataError:
+                        return None
+
+            snapshots = await asyncio.gather(*(fetch_one(symbol) for symbol in symbols))
+        return {
+            symbol: snapshot
+            for symbol, snapshot in zip(symbols, snapshots)
+            if snapshot is not None
+        }
+
+    def fetch(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        snapshot = self.fetch_many([symbol], lookback).get(symbol)
+        if snapshot is None:
+            raise NoDataError(f"No data returned for {symbol}{self.suffix}.")
+        return snapshot
+
+    def fetch_many(
+        self, symbols: Sequence[str], lookback: Optional[int] = None
+    ) -> Dict[str, MarketSnapshot]:
+        return asyncio.run(self._fetch_all(list(symbols), lookback))
+
+    async def aclose(self) -> None:
+        scope, self._client_scope = self._client_scope, None
+        self._client = self._client_loop = None
+        if scope is not None:
+            await scope.aclose()
@@ -2,32 +2,337 @@
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
-from bot.core.filters import evaluate_filters
-from bot.core.market_data import MarketDataProvider, MarketSnapshot
+from bot.core.filters import DEFAULT_WARMUP_BARS, FilterPlan, compile_conditions
+from bot.core.health import CircuitBreaker
+from bot.core.market_data import (
+    MarketDataProvider,
+    MarketSnapshot,
+    NoDataError,
+    UpstreamError,
+)
+from bot.core.metrics import metrics
+from bot.core.streaming import IndicatorRegistry
+from bot.core.universe import UniverseMatrix
+
+NO_DATA = "No data returned."
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
 class ScreeningResult:
     symbol: str
     passed: bool
-    snapshot: MarketSnapshot
+    snapshot: Optional[MarketSnapshot] = None
+
+
+def _failure_kind(exc: BaseException) -> Optional[bool]:
+    """``True`` for a no-data answer, ``False`` for a transient upstream failure, else ``None``.
+
+    Only the first two are counted by the circuit breaker; configuration and
+    programming errors are reported without being cached.
+    """
+    if isinstance(exc, NoDataError):
+        return True
+    if isinstance(exc, (UpstreamError, TimeoutError, OSError)):
+        return False
+    return None
+
+
+def _chunks(symbols: Sequence[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [list(symbols[start : start + size]) for start in range(0, len(symbols), size)]
+
+
+def _fetch_batch(
+    provider: MarketDataProvider,
+    symbols: Sequence[str],
+    lookback: Optional[int] = None,
+) -> Tuple[Dict[str, MarketSnapshot], List[str]]:
+    """Fetch one chunk; also returns the symbols the provider had no data for."""
+    started = time.perf_counter()
+    fetched = provider.fetch_many(symbols, lookback)
+    elapsed = time.perf_counter() - started
+    metrics.observe("fetch", elapsed)
+    for symbol in fetched:
+        metrics.observe_symbol(symbol, elapsed)
+    snapshots = {symbol: fetched[symbol] for symbol in symbols if symbol in fetched}
+    missing = [symbol for symbol in symbols if symbol not in fetched]
+    return snapshots, missing
+
+
+def _fetch_symbol(
+    provider: MarketDataProvider,
+    symbol: str,
+    lookback: Optional[int] = None,
+) -> MarketSnapshot:
+    started = time.perf_counter()
+    snapshot = provider.fetch(symbol, lookback)
+    elapsed = time.perf_counter() - started
+    metrics.observe("fetch", elapsed)
+    metrics.observe_symbol(symbol, elapsed)
+    return snapshot
 
 
 def run_screening(
     provider: MarketDataProvider,
     tickers: Iterable[str],
     conditions: list,
+    warmup: int = DEFAULT_WARMUP_BARS,
+) -> Tuple[List[ScreeningResult], List[str]]:
+    """Fetch only as much history as the plan needs, plus ``warmup`` bars for EMA-style fields."""
+    with metrics.time("screening"):
+        return _run_screening(provider, tickers, compile_conditions(conditions), warmup)
+
+
+def _run_screening(
+    provider: MarketDataProvider,
+    tickers: Iterable[str],
+    plan: FilterPlan,
+    warmup: int,
 ) -> Tuple[List[ScreeningResult], List[str]]:
+    lookback = plan.lookback(warmup)
+    if provider.supports_batch:
+        snapshots: Dict[str, MarketSnapshot] = {}
+        fetch_errors: List[str] = []
+        for chunk in _chunks(list(dict.fromkeys(tickers)), provider.batch_size):
+            try:
+                fetched, missing = _fetch_batch(provider, chunk, lookback)
+            except Exception as exc:  # noqa: BLE001 - keep engine resilient
+                fetch_errors.extend(f"{symbol}: {exc}" for symbol in chunk)
+                continue
+            snapshots.update(fetched)
+            fetch_errors.extend(f"{symbol}: {NO_DATA}" for symbol in missing)
+        metrics.increment("fetch_errors_total", len(fetch_errors))
+        results, errors = evaluate_snapshots(snapshots, plan)
+        return results, fetch_errors + errors
+
+    results = []
+    errors = []
+    for symbol in tickers:
+        try:
+            snapshot = _fetch_symbol(provider, symbol, lookback)
+        except Exception as exc:  # noqa: BLE001 - keep engine resilient
+            metrics.increment("fetch_errors_total")
+            errors.append(f"{symbol}: {exc}")
+            continue
+        try:
+            passed = plan.evaluate(snapshot)
+            results.append(ScreeningResult(symbol=symbol, passed=passed, snapshot=snapshot))
+        except Exception as exc:  # noqa: BLE001 - keep engine resilient
+            metrics.increment("evaluation_errors_total")
+            errors.append(f"{symbol}: {exc}")
+    return results, errors
+
+
+def evaluate_snapshots(
+    snapshots: Dict[str, MarketSnapshot],
+    conditions: list,
+    indicators: Optional[IndicatorRegistry] = None,
+) -> Tuple[List[ScreeningResult], List[str]]:
+    plan = compile_conditions(conditions)
     results: List[ScreeningResult] = []
     errors: List[str] = []
-    for symbol in tickers:
+    for symbol, snapshot in snapshots.items():
         try:
-            snapshot = provider.fetch(symbol)
-            passed = evaluate_filters(conditions, snapshot)
+            state = indicators.for_symbol(symbol) if indicators is not None else None
+            passed = plan.evaluate(snapshot, state)
             results.append(ScreeningResult(symbol=symbol, passed=passed, snapshot=snapshot))
         except Exception as exc:  # noqa: BLE001 - keep engine resilient
             errors.append(f"{symbol}: {exc}")
+    metrics.increment("evaluation_errors_total", len(errors))
+    return results, errors
+
+
+def evaluate_matrix(
+    matrix: UniverseMatrix,
+    conditions: list,
+) -> Tuple[List[ScreeningResult], List[str]]:
+    """Vectorised counterpart of ``evaluate_snapshots`` over a universe matrix."""
+    plan = compile_conditions(conditions)
+    started = time.perf_counter()
+    mask = matrix.mask(plan)
+    failed = matrix.plan_errors(plan)
+    metrics.observe("evaluate_matrix", time.perf_counter() - started)
+    metrics.increment("evaluation_errors_total", len(failed))
+    results = [
+        ScreeningResult(symbol=symbol, passed=bool(passed), snapshot=snapshot)
+        for row, (symbol, snapshot, passed) in enumerate(
+            zip(matrix.symbols, matrix.snapshots, mask)
+        )
+        if row not in failed
+    ]
+    errors = [f"{matrix.symbols[row]}: {message}" for row, message in failed.items()]
     return results, errors
+
+
+class AsyncScreeningEngine:
+    """Run screening off the event loop on a bounded thread pool.
+
+    Providers with ``supports_async`` are awaited on the loop instead, one
+    coroutine per symbol under the same concurrency limit and timeout.
+
+    With a ``breaker`` symbols in cooldown are not fetched but are still
+    listed in the errors of every request for them, so a caller is told they
+    are unavailable rather than seeing no match.
+
+    Each fetch asks the provider for the plan's lookback; ``warmup`` extra
+    bars let EMA-style indicators converge on the truncated history.
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        concurrency: int = 16,
+        timeout: float = 20.0,
+        breaker: Optional[CircuitBreaker] = None,
+        warmup: int = DEFAULT_WARMUP_BARS,
+    ) -> None:
+        self.provider = provider
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.breaker = breaker
+        self.warmup = warmup
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="screening"
+            )
+        return self._executor
+
+    async def fetch(
+        self,
+        tickers: Iterable[str],
+        lookback: Optional[int] = None,
+    ) -> Tuple[Dict[str, MarketSnapshot], List[str]]:
+        """Fetch ``tickers`` keeping ``lookback`` bars each; ``None`` keeps the full window."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_symbol(symbol: str) -> MarketSnapshot:
+            async with semaphore:
+                future = loop.run_in_executor(
+                    executor, _fetch_symbol, self.provider, symbol, lookback
+                )
+                try:
+                    return await asyncio.wait_for(future, timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Timed out after {self.timeout:g}s.") from None
+
+        async def fetch_native(symbol: str) -> MarketSnapshot:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    snapshot = await asyncio.wait_for(
+                        self.provider.fetch_async(symbol, lookback), timeout=self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Timed out after {self.timeout:g}s.") from None
+                elapsed = time.perf_counter() - started
+                metrics.observe("fetch", elapsed)
+                metrics.observe_symbol(symbol, elapsed)
+                return snapshot
+
+        async def fetch_chunk(chunk: List[str]) -> Tuple[Dict[str, MarketSnapshot], List[str]]:
+            async with semaphore:
+                future = loop.run_in_executor(
+                    executor, _fetch_batch, self.provider, chunk, lookback
+                )
+                try:
+                    return await asyncio.wait_for(future, timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Timed out after {self.timeout:g}s.") from None
+
+        symbols = list(dict.fromkeys(tickers))
+        skipped: Dict[str, str] = {}
+        if self.breaker is not None:
+            symbols, skipped = self.breaker.split(symbols)
+        snapshots: Dict[str, MarketSnapshot] = {}
+        failures: Dict[str, Tuple[str, Optional[bool]]] = {}
+        if self.provider.supports_batch and not self.provider.supports_async:
+            chunks = _chunks(symbols, self.provider.batch_size)
+            outcomes = await asyncio.gather(
+                *(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True
+            )
+            for chunk, outcome in zip(chunks, outcomes):
+                if isinstance(outcome, asyncio.CancelledError):
+                    raise outcome
+                if isinstance(outcome, BaseException):
+                    kind = _failure_kind(outcome)
+                    failures.update((symbol, (str(outcome), kind)) for symbol in chunk)
+                else:
+                    snapshots.update(outcome[0])
+                    failures.update((symbol, (NO_DATA, True)) for symbol in outcome[1])
+        else:
+            fetch_one = fetch_native if self.provider.supports_async else fetch_symbol
+            outcomes = await asyncio.gather(
+                *(fetch_one(symbol) for symbol in symbols), return_exceptions=True
+            )
+            for symbol, outcome in zip(symbols, outcomes):
+                if isinstance(outcome, asyncio.CancelledError):
+                    raise outcome
+                if isinstance(outcome, BaseException):
+                    failures[symbol] = (str(outcome), _failure_kind(outcome))
+                else:
+                    snapshots[symbol] = outcome
+        return snapshots, self._fetch_errors(snapshots, failures, skipped)
+
+    def _fetch_errors(
+        self,
+        snapshots: Dict[str, MarketSnapshot],
+        failures: Dict[str, Tuple[str, Optional[bool]]],
+        skipped: Dict[str, str],
+    ) -> List[str]:
+        metrics.increment("fetch_errors_total", len(failures))
+        if self.breaker is not None:
+            for symbol in snapshots:
+                self.breaker.record_success(symbol)
+            for symbol, (message, negative) in failures.items():
+                if negative is not None:
+                    self.breaker.record_failure(symbol, message, negative)
+        errors = [f"{symbol}: {message}" for symbol, (message, _) in failures.items()]
+        errors.extend(f"{symbol}: {message}" for symbol, message in skipped.items())
+        return errors
+
+    async def offload(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the screening thread pool instead of the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def evaluate(
+        self,
+        snapshots: Dict[str, MarketSnapshot],
+        conditions: list,
+        indicators: Optional[IndicatorRegistry] = None,
+        matrix: Optional[UniverseMatrix] = None,
+    ) -> Tuple[List[ScreeningResult], List[str]]:
+        """Evaluate column-wise; pass a shared ``matrix`` to reuse columns across plans."""
+        if matrix is None:
+            matrix = UniverseMatrix(snapshots, indicators)
+        return await self.offload(evaluate_matrix, matrix, conditions)
+
+    async def run(
+        self,
+        tickers: Iterable[str],
+        conditions: list,
+    ) -> Tuple[List[ScreeningResult], List[str]]:
+        started = time.perf_counter()
+        plan = compile_conditions(conditions)
+        snapshots, fetch_errors = await self.fetch(tickers, plan.lookback(self.warmup))
+        results, errors = await self.evaluate(snapshots, plan)
+        metrics.observe("screening", time.perf_counter() - started)
+        return results, fetch_errors + errors
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,198 @@
+"""Arithmetic expression grammar for filter operands.
+
+Grammar (``+ - * /`` with the usual precedence, unary minus and parentheses)::
+
+    expr    := term (("+" | "-") term)*
+    term    := unary (("*" | "/") unary)*
+    unary   := "-" unary | primary
+    primary := NUMBER | FIELD | "(" expr ")"
+
+Expressions evaluate the same way on scalars and on NumPy columns: the field
+lookup decides which one it returns. A missing scalar (``None``) makes the whole
+expression ``None``; in columns missing values are NaN and division by zero
+yields NaN, so both compare false.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+Lookup = Callable[[Any], Any]
+
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>\d[\d,]*(?:\.\d+)?|\.\d+)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<op>[-+*/()]))"
+)
+
+
+class Expression:
+    """Base node."""
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        raise NotImplementedError
+
+    def fields(self) -> Iterator[Any]:
+        return iter(())
+
+
+@dataclass(frozen=True)
+class Number(Expression):
+    value: float
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        return self.value
+
+    def __str__(self) -> str:
+        return f"{self.value:g}"
+
+
+@dataclass(frozen=True)
+class Field(Expression):
+    ref: Any
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        return lookup(self.ref)
+
+    def fields(self) -> Iterator[Any]:
+        yield self.ref
+
+    def __str__(self) -> str:
+        return str(self.ref.name)
+
+
+@dataclass(frozen=True)
+class Negate(Expression):
+    operand: Expression
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        value = self.operand.evaluate(lookup)
+        return None if value is None else -value
+
+    def fields(self) -> Iterator[Any]:
+        return self.operand.fields()
+
+    def __str__(self) -> str:
+        return f"-{self.operand}"
+
+
+@dataclass(frozen=True)
+class BinaryOp(Expression):
+    operator: str
+    left: Expression
+    right: Expression
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        left = self.left.evaluate(lookup)
+        if left is None:
+            return None
+        right = self.right.evaluate(lookup)
+        if right is None:
+            return None
+        if self.operator == "+":
+            return left + right
+        if self.operator == "-":
+            return left - right
+        if self.operator == "*":
+            return left * right
+        if isinstance(left, np.ndarray) or isinstance(right, np.ndarray):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(right == 0, np.nan, left / np.where(right == 0, 1, right))
+        return None if right == 0 else left / right
+
+    def fields(self) -> Iterator[Any]:
+        yield from self.left.fields()
+        yield from self.right.fields()
+
+    def __str__(self) -> str:
+        return f"({self.left} {self.operator} {self.right})"
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character in expression: {text[position:].strip()}")
+        kind = match.lastgroup or ""
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str, resolve: Callable[[str], Any]) -> None:
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+        self.resolve = resolve
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError(f"Incomplete expression: {self.text}")
+        self.position += 1
+        return token
+
+    def parse(self) -> Expression:
+        if not self.tokens:
+            raise ValueError("Empty expression.")
+        node = self._expr()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected '{self._peek()[1]}' in expression: {self.text}")
+        return node
+
+    def _expr(self) -> Expression:
+        node = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            operator = self._take()[1]
+            node = BinaryOp(operator, node, self._term())
+        return node
+
+    def _term(self) -> Expression:
+        node = self._unary()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            operator = self._take()[1]
+            node = BinaryOp(operator, node, self._unary())
+        return node
+
+    def _unary(self) -> Expression:
+        if self._peek() == ("op", "-"):
+            self._take()
+            operand = self._unary()
+            if isinstance(operand, Number):
+                return Number(-operand.value)
+            return Negate(operand)
+        return self._primary()
+
+    def _primary(self) -> Expression:
+        kind, value = self._take()
+        if kind == "number":
+            return Number(float(value.replace(",", "")))
+        if kind == "name":
+            return Field(self.resolve(value))
+        if value == "(":
+            node = self._expr()
+            if self._take() != ("op", ")"):
+                raise ValueError(f"Missing ')' in expression: {self.text}")
+            return node
+        raise ValueError(f"Unexpected '{value}' in expression: {self.text}")
+
+
+def parse_expression(text: str, resolve: Callable[[str], Any]) -> Expression:
+    """Parse ``text``; ``resolve`` turns each field name into a lookup key."""
+    return _Parser(text, resolve).parse()
+
+
+def render(expression: Expression) -> str:
+    text = str(expression)
+    if isinstance(expression, BinaryOp):
+        return text[1:-1]
+    return text
@@ -1,11 +1,27 @@
 """Filter parsing utilities."""
 
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 import re
+import time
 
-from bot.core.indicators import Candle, adx, ema, macd, roc, rsi, sma
+import numpy as np
+
+from bot.core.expressions import Expression, parse_expression, render
+from bot.core.indicators import (
+    Candle,
+    adx_series,
+    ema_series,
+    macd_series,
+    roc_series,
+    rsi_series,
+    sma_series,
+)
 from bot.core.market_data import MarketSnapshot
+from bot.core.metrics import metrics
+from bot.core.series import CandleSeries
+from bot.core.streaming import IndicatorKey, SymbolIndicators
 
 @dataclass(frozen=True)
 class FilterCondition:
@@ -14,27 +30,114 @@ class FilterCondition:
     value: str
 
 
-_FILTER_PATTERN = re.compile(
-    r"^(?P<field>[a-zA-Z0-9_]+)\s*(?P<op><=|>=|==|=|<|>)\s*(?P<value>.+)$"
+_COMPARISON_PATTERN = re.compile(r"<=|>=|==|=|<|>")
+_TITLE_PATTERN = re.compile(r"\s+title\s+(?P<title>.*)$", re.IGNORECASE)
+# A ticker code ends on the same word boundary as a name in the expression
+# grammar, so ``BBRI(price > 1)`` and ``BBRI -5 < change`` split cleanly.
+_SYMBOL_PATTERN = re.compile(r"\s*(?P<symbol>[A-Za-z][A-Za-z0-9]{1,5})\b(?:\s*,)?")
+# Every field name the filters understand. Matched strictly, so typos are
+# rejected at compile time and codes such as MAPI or EMTK are not mistaken
+# for ``ma``/``ema`` fields when splitting leading tickers.
+_FIELD_WORD = re.compile(
+    r"(prev\d+)?(open|high|low|close|price|volume|vol|gain|adx|macd[lsh]?"
+    r"|(ma|ema|rsi|roc)\d*|ma\d*vol)",
+    re.IGNORECASE,
 )
 
 
+def _comparisons(expression: str) -> List[re.Match]:
+    return list(_COMPARISON_PATTERN.finditer(expression))
+
+
+def _unwrap(expression: str) -> str:
+    """Drop parentheses around a whole condition: ``(price > 1)`` -> ``price > 1``."""
+    while expression.startswith("(") and expression.endswith(")"):
+        depth = 0
+        for position, char in enumerate(expression):
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if depth == 0 and position < len(expression) - 1:
+                return expression
+        expression = expression[1:-1].strip()
+    return expression
+
+
 def parse_filter_expression(expression: str) -> FilterCondition:
-    match = _FILTER_PATTERN.match(expression.strip())
-    if not match:
+    """Split ``<left> <op> <right>``; both sides may be arithmetic expressions."""
+    expression = _unwrap(expression)
+    matches = _comparisons(expression)
+    if len(matches) != 1:
         raise ValueError(f"Invalid filter expression: {expression}")
-    return FilterCondition(
-        field=match.group("field"),
-        operator=match.group("op"),
-        value=match.group("value").strip(),
-    )
+    match = matches[0]
+    field = expression[: match.start()].strip()
+    value = expression[match.end() :].strip()
+    if not field or not value:
+        raise ValueError(f"Invalid filter expression: {expression}")
+    return FilterCondition(field=field, operator=match.group(0), value=value)
+
+
+def split_title(text: str) -> Tuple[str, str]:
+    """Split ``"<filters> title <judul>"`` into the filter text and the title."""
+    match = _TITLE_PATTERN.search(text)
+    if not match:
+        return text.strip(), ""
+    return text[: match.start()].strip(), match.group("title").strip()
+
+
+def split_symbols(text: str) -> Tuple[List[str], str]:
+    """Split leading ticker codes (``"bren, bbca price > 9000"``) from the filter text.
+
+    A leading word is a ticker unless it is a filter field or is followed by a
+    comparison or a binary operator; a ``(`` or a unary ``-`` starts the
+    filter. Codes are upper-cased and de-duplicated in order.
+    """
+    symbols: List[str] = []
+    position = 0
+    text = text.lstrip()
+    while True:
+        match = _SYMBOL_PATTERN.match(text, position)
+        if match is None:
+            break
+        word = match.group("symbol")
+        following = text[match.end() :].lstrip()[:1]
+        if _FIELD_WORD.fullmatch(word) or not following or following in "<>=!+*/)":
+            break
+        symbols.append(word.upper())
+        position = match.end()
+    return list(dict.fromkeys(symbols)), text[position:].strip()
+
+
+def _split_top_level(text: str) -> List[str]:
+    chunks, depth, start = [], 0, 0
+    for position, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "+" and depth == 0:
+            chunks.append(text[start:position])
+            start = position + 1
+    chunks.append(text[start:])
+    return chunks
 
 
 def parse_filters(text: str) -> List[FilterCondition]:
+    """Split conditions on ``+``.
+
+    A ``+`` is a condition separator only when the parts on both sides each
+    contain a comparison; otherwise it is arithmetic (``close > ma20 + 5``).
+    """
+    text, _ = split_title(text)
     if not text.strip():
         return []
-    expressions = [chunk.strip() for chunk in text.split("+") if chunk.strip()]
-    return [parse_filter_expression(expr) for expr in expressions]
+    expressions: List[str] = []
+    for chunk in _split_top_level(text):
+        if not chunk.strip():
+            continue
+        if expressions and (not _comparisons(expressions[-1]) or not _comparisons(chunk)):
+            expressions[-1] = f"{expressions[-1]}+{chunk}"
+        else:
+            expressions.append(chunk)
+    return [parse_filter_expression(expr.strip()) for expr in expressions]
 
 
 def _resolve_period(field: str, prefix: str, default: int) -> int:
@@ -46,7 +149,7 @@ def _resolve_period(field: str, prefix: str, default: int) -> int:
 
 
 def _extract_prev(field: str) -> tuple[int, str]:
-    match = re.match(r"^prev(?P<period>\\d+)(?P<name>[a-zA-Z0-9_]+)$", field)
+    match = re.match(r"^prev(?P<period>\d+)(?P<name>[a-zA-Z0-9_]+)$", field)
     if not match:
         return 0, field
     return int(match.group("period")), match.group("name")
@@ -58,58 +161,210 @@ def _candle_from_snapshot(snapshot: MarketSnapshot) -> Candle:
     return snapshot.candles[-1]
 
 
-def _value_for_field(field: str, snapshot: MarketSnapshot) -> Optional[float]:
-    candles = snapshot.candles
-    if not candles:
-        return None
-    offset, base_field = _extract_prev(field)
-    if offset >= len(candles):
-        return None
-    candle = candles[-1 - offset]
-    if base_field in {"open", "high", "low", "close", "price"}:
-        return float(getattr(candle, "close" if base_field == "price" else base_field))
-    if base_field == "volume" or base_field == "vol":
-        return float(candle.volume)
-    if base_field == "gain":
-        if len(candles) < 2 + offset:
-            return None
-        prev_close = candles[-2 - offset].close
-        if prev_close == 0:
-            return None
-        return ((candle.close - prev_close) / prev_close) * 100
+_PRICE_FIELDS = {"open", "high", "low", "close", "price"}
+_VOLUME_FIELDS = {"volume", "vol"}
+_MACD_OUTPUTS = {"macd": "macd", "macdl": "macd", "macds": "signal", "macdh": "hist"}
 
-    close_values = [c.close for c in candles[: len(candles) - offset]]
-    volume_values = [c.volume for c in candles[: len(candles) - offset]]
+# Relative evaluation cost per field family; cheap OHLCV checks run first so
+# they can short-circuit before any indicator is computed.
+_INDICATOR_COSTS = {"sma": 2, "roc": 2, "ema": 3, "rsi": 3, "adx": 4, "macd": 4}
 
+# Recursively smoothed indicators depend on every earlier bar; evaluated on a
+# truncated history they need extra warm-up bars before the seed washes out.
+_RECURSIVE = {"ema", "rsi", "adx", "macd"}
+DEFAULT_WARMUP_BARS = 200
+# ``macd_series`` defaults: the signal line needs ``slow + signal`` bars.
+_MACD_BARS = 26 + 9
+
+
+def _indicator_key(base_field: str) -> Optional[IndicatorKey]:
+    if base_field in _MACD_OUTPUTS:
+        return ("macd", _MACD_OUTPUTS[base_field])
     if base_field.startswith("ma") and base_field.endswith("vol"):
-        period = _resolve_period(base_field, "ma", 20)
-        return sma(volume_values, period)
+        return ("sma", "volume", _resolve_period(base_field[:-3], "ma", 20))
     if base_field.startswith("ma"):
-        period = _resolve_period(base_field, "ma", 20)
-        return sma(close_values, period)
+        return ("sma", "close", _resolve_period(base_field, "ma", 20))
     if base_field.startswith("ema"):
-        period = _resolve_period(base_field, "ema", 20)
-        return ema(close_values, period)
+        return ("ema", _resolve_period(base_field, "ema", 20))
     if base_field.startswith("rsi"):
-        period = _resolve_period(base_field, "rsi", 14)
-        return rsi(close_values, period)
+        return ("rsi", _resolve_period(base_field, "rsi", 14))
     if base_field.startswith("roc"):
-        period = _resolve_period(base_field, "roc", 14)
-        return roc(close_values, period)
+        return ("roc", _resolve_period(base_field, "roc", 14))
     if base_field == "adx":
-        return adx(candles)
-    if base_field in {"macd", "macds", "macdl", "macdh"}:
-        values = macd(close_values)
-        mapping = {"macd": "macd", "macdl": "macd", "macds": "signal", "macdh": "hist"}
-        return values[mapping[base_field]]
+        return ("adx", 14)
     return None
 
 
-def _parse_value(value: str) -> float:
-    return float(value.replace(",", ""))
+def _indicator_series(
+    key: IndicatorKey,
+    candles: CandleSeries,
+    cache: Optional[Dict[IndicatorKey, object]] = None,
+) -> np.ndarray:
+    name = key[0]
+    if name == "macd":
+        outputs = cache.get(("macd",)) if cache is not None else None
+        if outputs is None:
+            started = time.perf_counter()
+            outputs = macd_series(candles.close)
+            metrics.observe("indicators", time.perf_counter() - started)
+            if cache is not None:
+                cache[("macd",)] = outputs
+        return outputs[str(key[1])]
+    if cache is not None and key in cache:
+        return cache[key]
+    started = time.perf_counter()
+    if name == "sma":
+        series = sma_series(getattr(candles, str(key[1])), int(key[2]))
+    elif name == "ema":
+        series = ema_series(candles.close, int(key[1]))
+    elif name == "rsi":
+        series = rsi_series(candles.close, int(key[1]))
+    elif name == "roc":
+        series = roc_series(candles.close, int(key[1]))
+    else:
+        series = adx_series(candles.high, candles.low, candles.close, int(key[1]))
+    metrics.observe("indicators", time.perf_counter() - started)
+    if cache is not None:
+        cache[key] = series
+    return series
+
+
+@dataclass(frozen=True)
+class FieldRef:
+    """A filter field resolved once: ``prevN`` offset, base name and indicator key."""
+
+    name: str
+    offset: int
+    base: str
+    key: Optional[IndicatorKey]
+    cost: int
+
+    def lookback(self, warmup: int = 0) -> int:
+        """Bars needed for a value at this offset; recursive indicators add ``warmup``."""
+        key = self.key
+        if key is None:
+            bars = 2 if self.base == "gain" else 1
+        elif key[0] == "macd":
+            bars = _MACD_BARS
+        elif key[0] == "sma":
+            bars = int(key[2])
+        elif key[0] == "adx":
+            bars = 2 * int(key[1])
+        elif key[0] in ("rsi", "roc"):
+            bars = int(key[1]) + 1
+        else:
+            bars = int(key[1])
+        if key is not None and key[0] in _RECURSIVE:
+            bars += warmup
+        return bars + self.offset
+
+
+@lru_cache(maxsize=512)
+def resolve_field(field: str) -> FieldRef:
+    """Resolve a field name; raises ``ValueError`` for names no filter understands."""
+    name = field.lower()
+    if not _FIELD_WORD.fullmatch(name):
+        raise ValueError(f"Unknown field: {field}")
+    offset, base = _extract_prev(name)
+    if base in _PRICE_FIELDS or base in _VOLUME_FIELDS:
+        return FieldRef(name=name, offset=offset, base=base, key=None, cost=0)
+    if base == "gain":
+        return FieldRef(name=name, offset=offset, base=base, key=None, cost=1)
+    key = _indicator_key(base)
+    cost = _INDICATOR_COSTS[str(key[0])] if key is not None else 0
+    return FieldRef(name=name, offset=offset, base=base, key=key, cost=cost)
+
+
+def bar_column(ref: FieldRef) -> Optional[str]:
+    """Candle column a price or volume field reads directly, or ``None`` for derived fields."""
+    if ref.base in _PRICE_FIELDS:
+        return "close" if ref.base == "price" else ref.base
+    if ref.base in _VOLUME_FIELDS:
+        return "volume"
+    return None
+
+
+class FieldReader:
+    """Read field values from one snapshot, computing each indicator at most once."""
+
+    def __init__(
+        self,
+        snapshot: MarketSnapshot,
+        indicators: Optional[SymbolIndicators] = None,
+    ) -> None:
+        self.candles = snapshot.candles
+        self.indicators = indicators
+        self._series: Dict[IndicatorKey, object] = {}
+
+    def value(self, ref: FieldRef) -> Optional[float]:
+        candles = self.candles
+        if not candles or ref.offset >= len(candles):
+            return None
+        index = len(candles) - 1 - ref.offset
+        base = ref.base
+        if base in _PRICE_FIELDS:
+            column = candles.close if base == "price" else getattr(candles, base)
+            return float(column[index])
+        if base in _VOLUME_FIELDS:
+            return float(candles.volume[index])
+        if base == "gain":
+            if index < 1:
+                return None
+            prev_close = candles.close[index - 1]
+            if prev_close == 0:
+                return None
+            return float((candles.close[index] - prev_close) / prev_close * 100)
+        if ref.key is None:
+            return None
+        if self.indicators is not None and ref.offset < self.indicators.history:
+            return self.indicators.value(ref.key, candles, ref.offset)
+        value = _indicator_series(ref.key, candles, self._series)[index]
+        return None if np.isnan(value) else float(value)
+
 
+def field_series(
+    ref: FieldRef,
+    candles: CandleSeries,
+    cache: Optional[Dict[IndicatorKey, object]] = None,
+) -> np.ndarray:
+    """``ref`` at every bar, as ``FieldReader`` would read it if the series ended there.
 
-_OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    Missing values are NaN. Indicators are causal, so evaluating them once over
+    the whole history gives the same value at each bar as on its prefix.
+    """
+    base = ref.base
+    if base in _PRICE_FIELDS:
+        values = candles.close if base == "price" else getattr(candles, base)
+    elif base in _VOLUME_FIELDS:
+        values = candles.volume
+    elif base == "gain":
+        values = np.full(len(candles), np.nan)
+        if len(candles) > 1:
+            previous = candles.close[:-1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = (candles.close[1:] - previous) / previous * 100
+            values[1:] = np.where(previous == 0, np.nan, change)
+    elif ref.key is not None:
+        values = _indicator_series(ref.key, candles, cache)
+    else:
+        return np.full(len(candles), np.nan)
+    values = np.asarray(values, dtype=float)
+    if not ref.offset:
+        return values
+    shifted = np.full(len(values), np.nan)
+    shifted[ref.offset :] = values[: len(values) - ref.offset]
+    return shifted
+
+
+def _value_for_field(
+    field: str,
+    snapshot: MarketSnapshot,
+    indicators: Optional[SymbolIndicators] = None,
+) -> Optional[float]:
+    return FieldReader(snapshot, indicators).value(resolve_field(field))
+
+
+_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
     "<": lambda left, right: left < right,
     "<=": lambda left, right: left <= right,
     ">": lambda left, right: left > right,
@@ -119,15 +374,134 @@ _OPERATORS: dict[str, Callable[[float, float], bool]] = {
 }
 
 
-def evaluate_filters(conditions: List[FilterCondition], snapshot: MarketSnapshot) -> bool:
-    for condition in conditions:
-        left = _value_for_field(condition.field.lower(), snapshot)
+@dataclass(frozen=True)
+class Predicate:
+    left: Expression
+    operator: str
+    compare: Callable[[Any, Any], Any]
+    right: Expression
+    fields: Tuple[FieldRef, ...]
+    cost: int
+
+    def test(self, lookup: Callable[[FieldRef], Any]) -> Any:
+        """Scalar lookups give a bool; column lookups give a boolean mask."""
+        left = self.left.evaluate(lookup)
         if left is None:
             return False
-        right = _parse_value(condition.value)
-        operator = _OPERATORS.get(condition.operator)
-        if operator is None:
-            return False
-        if not operator(left, right):
+        right = self.right.evaluate(lookup)
+        if right is None:
             return False
-    return True
+        with np.errstate(invalid="ignore"):
+            return self.compare(left, right)
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """Conditions compiled once: resolved fields, parsed constants, cheapest first."""
+
+    key: str
+    conditions: Tuple[FilterCondition, ...]
+    predicates: Tuple[Predicate, ...]
+    indicator_keys: Tuple[IndicatorKey, ...]
+
+    def __len__(self) -> int:
+        return len(self.conditions)
+
+    def __iter__(self):
+        return iter(self.conditions)
+
+    @property
+    def fields(self) -> Tuple[FieldRef, ...]:
+        unique: Dict[str, FieldRef] = {}
+        for predicate in self.predicates:
+            for ref in predicate.fields:
+                unique.setdefault(ref.name, ref)
+        return tuple(unique.values())
+
+    def lookback(self, warmup: int = 0) -> int:
+        """Most bars any field needs, counting ``prevN`` offsets and indicator periods."""
+        return max((ref.lookback(warmup) for ref in self.fields), default=1)
+
+    def evaluate(
+        self,
+        snapshot: MarketSnapshot,
+        indicators: Optional[SymbolIndicators] = None,
+    ) -> bool:
+        started = time.perf_counter()
+        reader = FieldReader(snapshot, indicators)
+        passed = all(predicate.test(reader.value) for predicate in self.predicates)
+        metrics.observe("evaluate", time.perf_counter() - started)
+        return passed
+
+
+def _parse_operand(text: str) -> Expression:
+    return parse_expression(text, resolve_field)
+
+
+def _compile_predicate(condition: FilterCondition) -> Predicate:
+    compare = _OPERATORS.get(condition.operator)
+    if compare is None:
+        raise ValueError(f"Unknown operator: {condition.operator}")
+    left = _parse_operand(condition.field)
+    right = _parse_operand(condition.value)
+    fields = tuple({ref.name: ref for ref in [*left.fields(), *right.fields()]}.values())
+    return Predicate(
+        left=left,
+        operator=condition.operator,
+        compare=compare,
+        right=right,
+        fields=fields,
+        cost=sum(ref.cost for ref in fields),
+    )
+
+
+def _condition_text(predicate: Predicate) -> str:
+    return f"{render(predicate.left)} {predicate.operator} {render(predicate.right)}"
+
+
+@lru_cache(maxsize=256)
+def _compile_conditions(conditions: Tuple[FilterCondition, ...]) -> FilterPlan:
+    predicates = sorted(
+        (_compile_predicate(condition) for condition in conditions),
+        key=lambda predicate: predicate.cost,
+    )
+    indicator_keys: Dict[IndicatorKey, None] = {}
+    for predicate in predicates:
+        for ref in predicate.fields:
+            if ref.key is not None:
+                indicator_keys[ref.key] = None
+    return FilterPlan(
+        key=" + ".join(sorted({_condition_text(predicate) for predicate in predicates})),
+        conditions=conditions,
+        predicates=tuple(predicates),
+        indicator_keys=tuple(indicator_keys),
+    )
+
+
+def normalize_filters(text: str) -> str:
+    return " ".join(split_title(text)[0].lower().split())
+
+
+@lru_cache(maxsize=256)
+def _compile_normalized(text: str) -> FilterPlan:
+    return _compile_conditions(tuple(parse_filters(text)))
+
+
+def compile_filters(text: str) -> FilterPlan:
+    """Parse and compile filter text; plans are cached by normalised text."""
+    return _compile_normalized(normalize_filters(text))
+
+
+def compile_conditions(conditions: Union[FilterPlan, Sequence[FilterCondition]]) -> FilterPlan:
+    if isinstance(conditions, FilterPlan):
+        return conditions
+    return _compile_conditions(tuple(conditions))
+
+
+def evaluate_filters(
+    conditions: Union[FilterPlan, List[FilterCondition]],
+    snapshot: MarketSnapshot,
+    indicators: Optional[SymbolIndicators] = None,
+) -> bool:
+    """Check every condition; ``indicators`` switches indicator fields to streaming state."""
+    return compile_conditions(conditions).evaluate(snapshot, indicators)
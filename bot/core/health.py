@@ -0,0 +1,98 @@
+"""Per-symbol circuit breaker so dead tickers stop costing a fetch every poll."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class SymbolFailure:
+    failures: int
+    open_until: float
+    message: str
+    negative: bool
+
+
+class CircuitBreaker:
+    """Skip failing symbols until their cooldown expires.
+
+    A failure opens the breaker for ``base_cooldown`` seconds, doubling on each
+    consecutive failure up to ``max_cooldown``. "No data" answers (delisted or
+    suspended tickers) are negative-cached with the longer ``negative_cooldown``
+    as the starting point. Once the cooldown has passed the symbol is fetched
+    again; success closes the breaker. Only transient upstream failures should
+    be recorded: a configuration error is not the symbol's fault and must not
+    be cached. ``record_*`` report whether the symbol changed state.
+    """
+
+    def __init__(
+        self,
+        base_cooldown: float = 30.0,
+        negative_cooldown: float = 900.0,
+        max_cooldown: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.base_cooldown = base_cooldown
+        self.negative_cooldown = negative_cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self._failures: Dict[str, SymbolFailure] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._failures
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def failure(self, symbol: str) -> Optional[SymbolFailure]:
+        return self._failures.get(symbol)
+
+    def allow(self, symbol: str) -> bool:
+        failure = self._failures.get(symbol)
+        return failure is None or failure.open_until <= self.clock()
+
+    def filter(self, symbols: Iterable[str]) -> List[str]:
+        now = self.clock()
+        with self._lock:
+            return [
+                symbol
+                for symbol in symbols
+                if symbol not in self._failures or self._failures[symbol].open_until <= now
+            ]
+
+    def split(self, symbols: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+        """Symbols that may be fetched now, and the reason each other one is skipped."""
+        now = self.clock()
+        allowed: List[str] = []
+        skipped: Dict[str, str] = {}
+        with self._lock:
+            for symbol in symbols:
+                failure = self._failures.get(symbol)
+                if failure is None or failure.open_until <= now:
+                    allowed.append(symbol)
+                else:
+                    remaining = failure.open_until - now
+                    skipped[symbol] = f"Unavailable for {remaining:.0f}s after: {failure.message}"
+        return allowed, skipped
+
+    def record_success(self, symbol: str) -> bool:
+        with self._lock:
+            return self._failures.pop(symbol, None) is not None
+
+    def record_failure(self, symbol: str, message: str, negative: bool = False) -> bool:
+        with self._lock:
+            previous = self._failures.get(symbol)
+            failures = previous.failures + 1 if previous is not None else 1
+            base = self.negative_cooldown if negative else self.base_cooldown
+            cooldown = min(base * 2 ** (failures - 1), self.max_cooldown)
+            self._failures[symbol] = SymbolFailure(
+                failures=failures,
+                open_until=self.clock() + cooldown,
+                message=message,
+                negative=negative,
+            )
+            return previous is None
@@ -1,9 +1,17 @@
-"""Indicator calculations used by filters."""
+"""Indicator calculations used by filters.
+
+The ``*_series`` functions are vectorised over NumPy arrays and return one value
+per input bar (NaN while the indicator is still warming up), so a ``prevN``
+lookback is just an index into the result. The scalar helpers return the latest
+value and keep the original call signatures.
+"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -15,90 +23,186 @@ class Candle:
     volume: float
 
 
-def sma(values: List[float], period: int) -> Optional[float]:
-    if len(values) < period or period <= 0:
-        return None
-    return sum(values[-period:]) / period
+# Largest exponent used when scaling a block in the closed-form recursion;
+# keeps decay ** -k far away from float64 overflow.
+_MAX_LOG_SCALE = 200.0
 
 
-def ema(values: List[float], period: int) -> Optional[float]:
-    if len(values) < period or period <= 0:
-        return None
-    multiplier = 2 / (period + 1)
-    ema_value = sum(values[:period]) / period
-    for value in values[period:]:
-        ema_value = (value - ema_value) * multiplier + ema_value
-    return ema_value
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
 
 
-def rsi(values: List[float], period: int = 14) -> Optional[float]:
-    if len(values) < period + 1:
-        return None
-    gains = []
-    losses = []
-    for prev, curr in zip(values[-(period + 1) : -1], values[-period:]):
-        change = curr - prev
-        if change >= 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-    avg_gain = sum(gains) / period
-    avg_loss = sum(losses) / period
-    if avg_loss == 0:
-        return 100.0
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
-
-
-def roc(values: List[float], period: int = 14) -> Optional[float]:
-    if len(values) <= period:
-        return None
-    prev = values[-(period + 1)]
-    if prev == 0:
-        return None
-    return ((values[-1] - prev) / prev) * 100
+def _nan(length: int) -> np.ndarray:
+    return np.full(length, np.nan)
 
 
-def adx(candles: List[Candle], period: int = 14) -> Optional[float]:
-    if len(candles) < period + 1:
+def _last(series: np.ndarray) -> Optional[float]:
+    if not len(series) or np.isnan(series[-1]):
         return None
-    trs = []
-    plus_dm = []
-    minus_dm = []
-    for prev, curr in zip(candles[:-1], candles[1:]):
-        tr = max(curr.high - curr.low, abs(curr.high - prev.close), abs(curr.low - prev.close))
-        trs.append(tr)
-        up_move = curr.high - prev.high
-        down_move = prev.low - curr.low
-        plus_dm.append(up_move if up_move > down_move and up_move > 0 else 0)
-        minus_dm.append(down_move if down_move > up_move and down_move > 0 else 0)
-    tr14 = sum(trs[-period:])
-    if tr14 == 0:
+    return float(series[-1])
+
+
+def smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """Evaluate ``y[i] = y[i-1] + alpha * (values[i] - y[i-1])`` with ``y[-1] = seed``.
+
+    The recursion is solved in closed form per block: within a block
+    ``y[k] = d**k * (seed + alpha * cumsum(x[j] / d**j))`` with ``d = 1 - alpha``,
+    which needs no Python-level loop over bars.
+    """
+    out = np.empty(len(values))
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = max(1, int(_MAX_LOG_SCALE / -np.log(decay)))
+    previous = seed
+    for start in range(0, len(values), block):
+        chunk = values[start : start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        result = powers * (previous + alpha * np.cumsum(chunk / powers))
+        out[start : start + len(chunk)] = result
+        previous = result[-1]
+    return out
+
+
+def sma_series(values: Sequence[float], period: int) -> np.ndarray:
+    data = _as_array(values)
+    out = _nan(len(data))
+    if period <= 0 or len(data) < period:
+        return out
+    totals = np.cumsum(data)
+    out[period - 1] = totals[period - 1]
+    out[period:] = totals[period:] - totals[:-period]
+    out[period - 1 :] /= period
+    return out
+
+
+def ema_series(values: Sequence[float], period: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first ``period`` values."""
+    data = _as_array(values)
+    out = _nan(len(data))
+    if period <= 0 or len(data) < period:
+        return out
+    seed = float(data[:period].mean())
+    out[period - 1] = seed
+    out[period:] = smooth(data[period:], 2 / (period + 1), seed)
+    return out
+
+
+def _wilder(values: np.ndarray, period: int, start: int) -> np.ndarray:
+    """Wilder average: simple mean of ``values[start:start+period]``, then alpha = 1/period."""
+    out = _nan(len(values))
+    first = start + period - 1
+    if len(values) <= first:
+        return out
+    seed = float(values[start : first + 1].mean())
+    out[first] = seed
+    out[first + 1 :] = smooth(values[first + 1 :], 1 / period, seed)
+    return out
+
+
+def rsi_series(values: Sequence[float], period: int = 14) -> np.ndarray:
+    data = _as_array(values)
+    out = _nan(len(data))
+    if period <= 0 or len(data) < period + 1:
+        return out
+    change = np.diff(data, prepend=data[0])
+    avg_gain = _wilder(np.clip(change, 0, None), period, 1)
+    avg_loss = _wilder(np.clip(-change, 0, None), period, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[(avg_loss == 0) & ~np.isnan(avg_gain)] = 100.0
+    return out
+
+
+def roc_series(values: Sequence[float], period: int = 14) -> np.ndarray:
+    data = _as_array(values)
+    out = _nan(len(data))
+    if period <= 0 or len(data) <= period:
+        return out
+    previous = data[:-period]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[period:] = np.where(previous == 0, np.nan, (data[period:] - previous) / previous * 100)
+    return out
+
+
+def adx_series(
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    period: int = 14,
+) -> np.ndarray:
+    """Wilder ADX; the first value appears after ``2 * period`` bars."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    out = _nan(len(close))
+    if period <= 0 or len(close) < 2 * period:
+        return out
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    up_move = np.diff(high, prepend=np.nan)
+    down_move = -np.diff(low, prepend=np.nan)
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    atr = _wilder(true_range, period, 1)
+    plus_avg = _wilder(plus_dm, period, 1)
+    minus_avg = _wilder(minus_dm, period, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(atr > 0, 100 * plus_avg / atr, 0.0)
+        minus_di = np.where(atr > 0, 100 * minus_avg / atr, 0.0)
+        dx = 100 * np.abs(plus_di - minus_di) / np.fmax(plus_di + minus_di, 1e-9)
+    return _wilder(dx, period, period)
+
+
+def macd_series(
+    values: Sequence[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> Dict[str, np.ndarray]:
+    """MACD line, signal and histogram in O(n); NaN until ``slow + signal`` bars exist."""
+    data = _as_array(values)
+    empty = {"macd": _nan(len(data)), "signal": _nan(len(data)), "hist": _nan(len(data))}
+    if len(data) < slow + signal:
+        return empty
+    line = ema_series(data, fast) - ema_series(data, slow)
+    signal_line = _nan(len(data))
+    signal_line[slow - 1 :] = ema_series(line[slow - 1 :], signal)
+    ready = slow + signal - 1
+    line[:ready] = np.nan
+    signal_line[:ready] = np.nan
+    return {"macd": line, "signal": signal_line, "hist": line - signal_line}
+
+
+def sma(values: Sequence[float], period: int) -> Optional[float]:
+    if len(values) < period or period <= 0:
         return None
-    plus_di = 100 * (sum(plus_dm[-period:]) / tr14)
-    minus_di = 100 * (sum(minus_dm[-period:]) / tr14)
-    dx = 100 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
-    return dx
-
-
-def macd(values: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
-    if len(values) < slow + signal:
-        return {"macd": None, "signal": None, "hist": None}
-    ema_fast = ema(values, fast)
-    ema_slow = ema(values, slow)
-    if ema_fast is None or ema_slow is None:
-        return {"macd": None, "signal": None, "hist": None}
-    macd_line = ema_fast - ema_slow
-    history = []
-    for i in range(slow, len(values) + 1):
-        slice_values = values[:i]
-        fast_val = ema(slice_values, fast)
-        slow_val = ema(slice_values, slow)
-        if fast_val is None or slow_val is None:
-            continue
-        history.append(fast_val - slow_val)
-    signal_val = ema(history, signal) if history else None
-    hist = macd_line - signal_val if signal_val is not None else None
-    return {"macd": macd_line, "signal": signal_val, "hist": hist}
+    return float(np.mean(_as_array(values[-period:])))
+
+
+def ema(values: Sequence[float], period: int) -> Optional[float]:
+    return _last(ema_series(values, period))
+
+
+def rsi(values: Sequence[float], period: int = 14) -> Optional[float]:
+    return _last(rsi_series(values, period))
+
+
+def roc(values: Sequence[float], period: int = 14) -> Optional[float]:
+    return _last(roc_series(values, period))
+
+
+def adx(candles: Any, period: int = 14) -> Optional[float]:
+    """ADX for a ``CandleSeries`` or a sequence of ``Candle``."""
+    if isinstance(candles, (list, tuple)):
+        high = [c.high for c in candles]
+        low = [c.low for c in candles]
+        close = [c.close for c in candles]
+        return _last(adx_series(high, low, close, period))
+    return _last(adx_series(candles.high, candles.low, candles.close, period))
+
+
+def macd(values: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
+    series = macd_series(values, fast, slow, signal)
+    return {key: _last(value) for key, value in series.items()}
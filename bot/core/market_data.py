@@ -3,68 +3,217 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 import importlib
 import importlib.util
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
+from bot.core.candle_cache import CandleCache
 from bot.core.indicators import Candle
+from bot.core.metrics import metrics
+from bot.core.series import CandleSeries
+
+_INTERVAL = "1m"
+# Ranges yfinance accepts for 1m bars, in trading days.
+_PERIODS = ((1, "1d"), (5, "5d"), (7, "7d"))
 
 
 @dataclass(frozen=True)
 class MarketSnapshot:
     symbol: str
-    candles: List[Candle]
+    candles: CandleSeries
 
 
 class MarketDataError(RuntimeError):
     """Raised when market data cannot be fetched."""
 
 
+class NoDataError(MarketDataError):
+    """The upstream answered but has no bars for the symbol (suspended or delisted)."""
+
+
+class UpstreamError(MarketDataError):
+    """Transient failure talking to the upstream: network, timeout or a 5xx/429 answer."""
+
+
 class MarketDataProvider:
     """Base provider."""
 
-    def fetch(self, symbol: str) -> MarketSnapshot:
+    supports_batch = False
+    supports_async = False
+    batch_size = 1
+
+    def fetch(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        """Latest bars for ``symbol``; ``lookback`` is the most bars the caller needs."""
         raise NotImplementedError
 
+    async def fetch_async(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        """Native coroutine fetch; only called when ``supports_async`` is set."""
+        raise NotImplementedError
 
-class YFinanceProvider(MarketDataProvider):
-    """Fetch OHLCV data using yfinance."""
+    def fetch_many(
+        self, symbols: Sequence[str], lookback: Optional[int] = None
+    ) -> Dict[str, MarketSnapshot]:
+        """Fetch several symbols at once; symbols without data are left out."""
+        return {symbol: self.fetch(symbol, lookback) for symbol in symbols}
 
-    def __init__(self, suffix: str) -> None:
-        self.suffix = suffix
 
-    def fetch(self, symbol: str) -> MarketSnapshot:
-        if importlib.util.find_spec("yfinance") is None:
-            raise MarketDataError("yfinance is not installed.")
-        yf = importlib.import_module("yfinance")
+def _frame_for_ticker(data: Any, ticker: str, single: bool) -> Optional[Any]:
+    columns = data.columns
+    if getattr(columns, "nlevels", 1) > 1:
+        if ticker in columns.get_level_values(0):
+            return data[ticker]
+        if ticker in columns.get_level_values(-1):
+            return data.xs(ticker, axis=1, level=-1)
+        return None
+    return data if single else None
+
+
+def _period(days: int) -> str:
+    for limit, period in _PERIODS:
+        if days <= limit:
+            return period
+    return _PERIODS[-1][1]
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Fetch OHLCV data using yfinance.
+
+    A first download covers only the trading days ``lookback`` bars span;
+    later polls resume from the last cached bar unless a deeper lookback is
+    requested than the cache holds.
+    """
+
+    supports_batch = True
+
+    def __init__(
+        self,
+        suffix: str,
+        batch_size: int = 50,
+        download: Optional[Callable[..., Any]] = None,
+        cache: Optional[CandleCache] = None,
+    ) -> None:
+        self.suffix = suffix
+        self.batch_size = max(1, batch_size)
+        self._download = download
+        self.cache = cache if cache is not None else CandleCache()
+        self._module: Any = None
+
+    def _yfinance(self):
+        if self._module is None:
+            if importlib.util.find_spec("yfinance") is None:
+                raise MarketDataError("yfinance is not installed.")
+            self._module = importlib.import_module("yfinance")
+        return self._module
+
+    def _resume_from(self, symbol: str, lookback: Optional[int] = None) -> Optional[datetime]:
+        last = self.cache.last_timestamp(symbol)
+        if last is None or not self.cache.covers(symbol, lookback):
+            return None
+        resume = datetime.fromtimestamp(last / 1e9, tz=timezone.utc)
+        if datetime.now(timezone.utc) - resume >= timedelta(days=self.cache.window_days):
+            return None
+        return resume
+
+    def _snapshot(
+        self, symbol: str, frame: Any, lookback: Optional[int] = None, resumed: bool = False
+    ) -> MarketSnapshot:
+        with metrics.time("convert"):
+            series = CandleSeries.from_frame(frame.dropna(subset=["Close"]))
+        merged = self.cache.merge(symbol, series, lookback, resumed=resumed)
+        return MarketSnapshot(symbol=symbol, candles=merged)
+
+    def fetch(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        yf = self._yfinance()
 
         ticker = f"{symbol}{self.suffix}"
-        data = yf.Ticker(ticker).history(period="7d", interval="1m")
+        history = yf.Ticker(ticker).history
+        start = self._resume_from(symbol, lookback)
+        with metrics.time("download"):
+            if start is None:
+                data = history(period=_period(self.cache.days(lookback)), interval=_INTERVAL)
+            else:
+                data = history(start=start, interval=_INTERVAL)
         if data.empty:
-            raise MarketDataError(f"No data returned for {ticker}.")
-        candles = [
-            Candle(
-                open=row["Open"],
-                high=row["High"],
-                low=row["Low"],
-                close=row["Close"],
-                volume=row["Volume"],
+            cached = self.cache.get(symbol) if start is not None else None
+            if cached:
+                return MarketSnapshot(symbol=symbol, candles=cached)
+            raise NoDataError(f"No data returned for {ticker}.")
+        return self._snapshot(symbol, data, lookback, resumed=start is not None)
+
+    def fetch_many(
+        self, symbols: Sequence[str], lookback: Optional[int] = None
+    ) -> Dict[str, MarketSnapshot]:
+        download = self._download or self._yfinance().download
+        snapshots: Dict[str, MarketSnapshot] = {}
+        for begin in range(0, len(symbols), self.batch_size):
+            chunk = list(symbols[begin : begin + self.batch_size])
+            starts = {symbol: self._resume_from(symbol, lookback) for symbol in chunk}
+            fresh = [symbol for symbol in chunk if starts[symbol] is None]
+            resumed = [symbol for symbol in chunk if starts[symbol] is not None]
+            if fresh:
+                period = _period(self.cache.days(lookback))
+                frames = self._download_chunk(download, fresh, period=period)
+                for symbol, frame in frames.items():
+                    snapshots[symbol] = self._snapshot(symbol, frame, lookback)
+            if resumed:
+                start = min(starts[symbol] for symbol in resumed)
+                frames = self._download_chunk(download, resumed, start=start)
+                for symbol in resumed:
+                    if symbol in frames:
+                        snapshots[symbol] = self._snapshot(
+                            symbol, frames[symbol], lookback, resumed=True
+                        )
+                    else:
+                        cached = self.cache.get(symbol)
+                        if cached:
+                            snapshots[symbol] = MarketSnapshot(symbol=symbol, candles=cached)
+        return snapshots
+
+    def _download_chunk(
+        self,
+        download: Callable[..., Any],
+        chunk: List[str],
+        **window: Any,
+    ) -> Dict[str, Any]:
+        tickers = [f"{symbol}{self.suffix}" for symbol in chunk]
+        with metrics.time("download"):
+            data = download(
+                tickers=tickers,
+                interval=_INTERVAL,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=False,
+                progress=False,
+                **window,
             )
-            for _, row in data.iterrows()
-        ]
-        return MarketSnapshot(symbol=symbol, candles=candles)
+        frames: Dict[str, Any] = {}
+        if data is None or data.empty:
+            return frames
+        for symbol, ticker in zip(chunk, tickers):
+            frame = _frame_for_ticker(data, ticker, single=len(tickers) == 1)
+            if frame is None:
+                continue
+            frame = frame.dropna(subset=["Close"])
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
 
 
 class MockProvider(MarketDataProvider):
     """Dummy provider for tests or offline demo."""
 
     def __init__(self, candles: Optional[List[Candle]] = None) -> None:
-        self._candles = candles or [
-            Candle(open=100, high=110, low=95, close=105, volume=100000),
-            Candle(open=105, high=115, low=100, close=112, volume=120000),
-            Candle(open=112, high=120, low=110, close=118, volume=180000),
-            Candle(open=118, high=125, low=115, close=121, volume=200000),
-        ]
-
-    def fetch(self, symbol: str) -> MarketSnapshot:
-        return MarketSnapshot(symbol=symbol, candles=self._candles)
+        self._candles = CandleSeries.from_candles(
+            candles
+            or [
+                Candle(open=100, high=110, low=95, close=105, volume=100000),
+                Candle(open=105, high=115, low=100, close=112, volume=120000),
+                Candle(open=112, high=120, low=110, close=118, volume=180000),
+                Candle(open=118, high=125, low=115, close=121, volume=200000),
+            ]
+        )
+
+    def fetch(self, symbol: str, lookback: Optional[int] = None) -> MarketSnapshot:
+        candles = self._candles if lookback is None else self._candles[-lookback:]
+        return MarketSnapshot(symbol=symbol, candles=candles)
@@ -0,0 +1,122 @@
+"""IDX trading calendar used to schedule polls around market sessions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+import math
+import os
+from typing import Iterable, List, Optional, Tuple
+
+WIB = timezone(timedelta(hours=7), "WIB")
+
+
+@dataclass(frozen=True)
+class Session:
+    name: str
+    start: time
+    end: time
+    polling: bool
+
+
+_MONDAY_TO_THURSDAY: Tuple[Session, ...] = (
+    Session("pre_opening", time(8, 45), time(9, 0), False),
+    Session("session_1", time(9, 0), time(12, 0), True),
+    Session("break", time(12, 0), time(13, 30), False),
+    Session("session_2", time(13, 30), time(15, 50), True),
+    Session("pre_closing", time(15, 50), time(16, 0), True),
+)
+
+_FRIDAY: Tuple[Session, ...] = (
+    Session("pre_opening", time(8, 45), time(9, 0), False),
+    Session("session_1", time(9, 0), time(11, 30), True),
+    Session("break", time(11, 30), time(14, 0), False),
+    Session("session_2", time(14, 0), time(15, 50), True),
+    Session("pre_closing", time(15, 50), time(16, 0), True),
+)
+
+CLOSED = "closed"
+
+
+def load_holidays(path: str) -> List[date]:
+    """Read ISO dates (``YYYY-MM-DD``), one per line; ``#`` starts a comment."""
+    if not path or not os.path.exists(path):
+        return []
+    holidays = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            text = line.split("#", 1)[0].strip()
+            if text:
+                holidays.append(date.fromisoformat(text))
+    return holidays
+
+
+class MarketCalendar:
+    """Jakarta sessions and holidays.
+
+    Polls are aligned to ``settle_seconds`` after each bar boundary inside a
+    polling session, from the session open up to and including its close, so
+    every closed 1m bar is picked up once and nights, weekends, holidays and
+    the lunch break cost nothing.
+    """
+
+    def __init__(
+        self,
+        holidays: Iterable[date] = (),
+        settle_seconds: float = 2.0,
+        bar_seconds: int = 60,
+    ) -> None:
+        self.holidays = frozenset(holidays)
+        self.settle_seconds = settle_seconds
+        self.bar_seconds = bar_seconds
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "MarketCalendar":
+        return cls(load_holidays(path), **kwargs)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def sessions(self, day: date) -> Tuple[Session, ...]:
+        if not self.is_trading_day(day):
+            return ()
+        return _FRIDAY if day.weekday() == 4 else _MONDAY_TO_THURSDAY
+
+    def phase(self, moment: Optional[datetime] = None) -> str:
+        local = (moment or datetime.now(timezone.utc)).astimezone(WIB)
+        clock = local.time()
+        for session in self.sessions(local.date()):
+            if session.start <= clock < session.end:
+                return session.name
+        return CLOSED
+
+    def is_polling(self, moment: Optional[datetime] = None) -> bool:
+        """Whether ``moment`` falls inside a session that is polled."""
+        local = (moment or datetime.now(timezone.utc)).astimezone(WIB)
+        clock = local.time()
+        return any(
+            session.polling and session.start <= clock < session.end
+            for session in self.sessions(local.date())
+        )
+
+    def next_poll(self, after: Optional[datetime] = None) -> datetime:
+        """First aligned poll time strictly after ``after``."""
+        after = (after or datetime.now(timezone.utc)).astimezone(WIB)
+        bar = timedelta(seconds=self.bar_seconds)
+        settle = timedelta(seconds=self.settle_seconds)
+        for offset in range(366):
+            day = after.date() + timedelta(days=offset)
+            for session in self.sessions(day):
+                if not session.polling:
+                    continue
+                start = datetime.combine(day, session.start, tzinfo=WIB)
+                end = datetime.combine(day, session.end, tzinfo=WIB)
+                steps = max(0, math.floor((after - settle - start) / bar) + 1)
+                boundary = start + steps * bar
+                if boundary <= end:
+                    return boundary + settle
+        raise ValueError("No trading session within a year; check the holiday calendar.")
+
+    def seconds_until_next_poll(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        return max(0.0, (self.next_poll(now) - now).total_seconds())
@@ -0,0 +1,218 @@
+"""In-process timing histograms, counters and gauges for the screening hot path."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, from a single cached filter check to a slow upstream call.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_PREFIX = "stockbot"
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is one bisect and two increments.
+
+    Updates are not locked: a thread switch in the middle of ``observe`` can
+    very rarely drop one sample, which is acceptable for monitoring and keeps
+    the cost well under a microsecond.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket, like ``histogram_quantile``."""
+        count = self.count
+        if not count:
+            return math.nan
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics: "Metrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Per-stage latency histograms, counters, per-symbol fetch latency and gauges.
+
+    Cheap enough to stay on in production: a timer costs two ``perf_counter``
+    calls and one unlocked histogram update. Gauges are callables read only
+    when a report is rendered.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.symbol_latency: Dict[str, float] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        (self.stages.get(stage) or self.histogram(stage)).observe(seconds)
+
+    def time(self, stage: str) -> _Timer:
+        return _Timer(self, stage)
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        if not amount:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_symbol(self, symbol: str, seconds: float) -> None:
+        """Latest fetch latency for ``symbol``; also feeds the ``fetch_symbol`` histogram."""
+        self.symbol_latency[symbol] = seconds
+        self.observe("fetch_symbol", seconds)
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        self.gauges[name] = read
+
+    def read_gauges(self) -> Dict[str, float]:
+        values = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                values[name] = float(read())
+            except Exception:  # noqa: BLE001 - a broken gauge must not break the report
+                values[name] = math.nan
+        return values
+
+    def slowest(self, limit: int = 5) -> List[Tuple[str, float]]:
+        return sorted(self.symbol_latency.items(), key=lambda item: -item[1])[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.symbol_latency.clear()
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = [
+            f"# HELP {_PREFIX}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {_PREFIX}_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.stages.items()):
+            count = histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(
+                f'{_PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}'
+            )
+            lines.append(f'{_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.9g}')
+            lines.append(f'{_PREFIX}_stage_seconds_count{{stage="{stage}"}} {count}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {_PREFIX}_{name} counter")
+            lines.append(f"{_PREFIX}_{name} {value:g}")
+        for name, value in sorted(self.read_gauges().items()):
+            lines.append(f"# TYPE {_PREFIX}_{name} gauge")
+            lines.append(f"{_PREFIX}_{name} {value:g}")
+        if self.symbol_latency:
+            lines.append(f"# TYPE {_PREFIX}_symbol_fetch_seconds gauge")
+            for symbol, seconds in sorted(self.symbol_latency.items()):
+                lines.append(f'{_PREFIX}_symbol_fetch_seconds{{symbol="{symbol}"}} {seconds:.6g}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Atomically replace ``path``, e.g. for node_exporter's textfile collector."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.render_prometheus())
+        os.replace(temporary, path)
+
+    def summary(self, stages: Optional[List[str]] = None) -> str:
+        """Short per-stage report (count, p50, p99) for the ``/stats`` command."""
+        lines = ["📊 Statistik bot"]
+        gauges = self.read_gauges()
+        for name, value in sorted(gauges.items()):
+            lines.append(f"{name}: {value:g}")
+        lines.append("")
+        lines.append("tahap: jumlah | p50 | p99")
+        for stage in stages or sorted(self.stages):
+            histogram = self.stages.get(stage)
+            count = histogram.count if histogram is not None else 0
+            if not count:
+                continue
+            lines.append(
+                f"{stage}: {count} | {_format_seconds(histogram.quantile(0.5))} | "
+                f"{_format_seconds(histogram.quantile(0.99))}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.extend(f"{name}: {value:g}" for name, value in sorted(self.counters.items()))
+        slowest = self.slowest()
+        if slowest:
+            lines.append("")
+            lines.append(
+                "Fetch paling lambat: "
+                + ", ".join(f"{symbol} {_format_seconds(seconds)}" for symbol, seconds in slowest)
+            )
+        return "\n".join(lines)
+
+
+def _format_seconds(seconds: float) -> str:
+    if math.isnan(seconds):
+        return "-"
+    if seconds < 0.001:
+        return f"{seconds * 1e6:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+metrics = Metrics()
@@ -0,0 +1,368 @@
+"""Shared market-data poller that fans one fetch out to every subscription."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from bot.core.engine import AsyncScreeningEngine, ScreeningResult
+from bot.core.filters import FieldRef, FilterPlan
+from bot.core.market_data import MarketSnapshot
+from bot.core.market_hours import MarketCalendar
+from bot.core.priority import PollPlanner
+from bot.core.streaming import IndicatorRegistry
+from bot.core.thresholds import ThresholdIndex, threshold_of
+from bot.core.universe import UniverseMatrix
+
+logger = logging.getLogger(__name__)
+
+TickCallback = Callable[[List[ScreeningResult], List[str]], Awaitable[None]]
+TickerLoader = Callable[[], List[str]]
+Evaluation = Tuple[List[ScreeningResult], List[str]]
+
+# Upper bound for one sleep while waiting for the next session, so a suspended
+# host or a clock change is noticed within a few minutes.
+_MAX_SLEEP_SECONDS = 300.0
+
+
+class SnapshotStore:
+    """Latest snapshot per symbol from the most recent poll."""
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, MarketSnapshot] = {}
+        self.matrix = UniverseMatrix({})
+        self.updated_at: Optional[float] = None
+
+    def replace(
+        self,
+        snapshots: Dict[str, MarketSnapshot],
+        indicators: Optional[IndicatorRegistry] = None,
+    ) -> None:
+        self._snapshots = dict(snapshots)
+        self.matrix = UniverseMatrix(self._snapshots, indicators, previous=self.matrix)
+        self.updated_at = time.time()
+
+    def update(
+        self,
+        fetched: Dict[str, MarketSnapshot],
+        universe: List[str],
+        indicators: Optional[IndicatorRegistry] = None,
+    ) -> None:
+        """Overlay freshly fetched snapshots, keeping the last one for the rest of ``universe``."""
+        previous = self._snapshots
+        merged: Dict[str, MarketSnapshot] = {}
+        for symbol in universe:
+            snapshot = fetched.get(symbol) or previous.get(symbol)
+            if snapshot is not None:
+                merged[symbol] = snapshot
+        self.replace(merged, indicators)
+
+    def get(self, symbol: str) -> Optional[MarketSnapshot]:
+        return self._snapshots.get(symbol)
+
+    def snapshots(self) -> Dict[str, MarketSnapshot]:
+        return self._snapshots
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+@dataclass
+class Subscription:
+    key: Hashable
+    plan: FilterPlan
+    on_tick: TickCallback
+    symbols: Optional[FrozenSet[str]] = None
+    indexed: bool = False
+
+    def scoped(
+        self,
+        results: List[ScreeningResult],
+        errors: List[str],
+    ) -> Evaluation:
+        """Keep only results and per-symbol errors for ``symbols``, if set."""
+        if self.symbols is None:
+            return results, errors
+        return (
+            [result for result in results if result.symbol in self.symbols],
+            [error for error in errors if _error_symbol(error) in self.symbols or ":" not in error],
+        )
+
+
+def _error_symbol(error: str) -> str:
+    return error.split(":", 1)[0]
+
+
+class MarketPoller:
+    """Fetch the universe once per tick and evaluate each distinct plan against it.
+
+    Subscriptions sharing a normalised plan are evaluated once and the result
+    is fanned out to all of them; per-chat state stays with each callback.
+
+    With a ``calendar`` the first tick runs immediately and later ticks follow
+    the trading sessions instead of the fixed ``interval``. The ``planner``
+    decides which symbols are refetched on each tick; the others are evaluated
+    on their last snapshot.
+
+    When every subscription names its symbols, only their union is fetched
+    and, with a ``scoped_interval``, polled that often during trading hours.
+
+    One-shot subscriptions on named symbols whose plan is a single
+    ``field <op> number`` go into a ``ThresholdIndex`` instead of a group:
+    they are checked by bisection after each poll and only called back when
+    they fire or when one of their symbols fails to fetch.
+    """
+
+    index_thresholds = True
+
+    def __init__(
+        self,
+        engine: AsyncScreeningEngine,
+        load_tickers: TickerLoader,
+        interval: float,
+        calendar: Optional[MarketCalendar] = None,
+        planner: Optional[PollPlanner] = None,
+        scoped_interval: Optional[float] = None,
+    ) -> None:
+        self.engine = engine
+        self.load_tickers = load_tickers
+        self.interval = interval
+        self.calendar = calendar
+        self.scoped_interval = scoped_interval
+        self.planner = planner if planner is not None else PollPlanner()
+        self.store = SnapshotStore()
+        self.indicators = IndicatorRegistry()
+        self.thresholds = ThresholdIndex()
+        self._subscriptions: Dict[Hashable, Subscription] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriptions(self) -> Dict[Hashable, Subscription]:
+        return self._subscriptions
+
+    def groups(self) -> Dict[str, List[Subscription]]:
+        """Subscriptions grouped by normalised plan; each group is evaluated once per tick."""
+        groups: Dict[str, List[Subscription]] = {}
+        for subscription in self._subscriptions.values():
+            if not subscription.indexed:
+                groups.setdefault(subscription.plan.key, []).append(subscription)
+        return groups
+
+    def scope(self) -> Optional[List[str]]:
+        """Union of subscribed symbols, or ``None`` when any subscription needs the universe."""
+        symbols: Dict[str, None] = {}
+        for subscription in self._subscriptions.values():
+            if subscription.symbols is None:
+                return None
+            symbols.update(dict.fromkeys(sorted(subscription.symbols)))
+        return list(symbols)
+
+    def subscribe(
+        self,
+        key: Hashable,
+        plan: FilterPlan,
+        on_tick: TickCallback,
+        symbols: Optional[Sequence[str]] = None,
+        once: bool = False,
+    ) -> None:
+        """``once`` marks a subscription that ends at its first match."""
+        self.thresholds.remove(key)
+        threshold = threshold_of(plan) if once and symbols and self.index_thresholds else None
+        if threshold is not None:
+            self.thresholds.add(key, threshold, symbols)
+        self._subscriptions[key] = Subscription(
+            key=key,
+            plan=plan,
+            on_tick=on_tick,
+            symbols=frozenset(symbols) if symbols else None,
+            indexed=threshold is not None,
+        )
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, key: Hashable) -> bool:
+        removed = self._subscriptions.pop(key, None) is not None
+        self.thresholds.remove(key)
+        task = self._task
+        if not self._subscriptions and task is not None and task is not asyncio.current_task():
+            task.cancel()
+            self._task = None
+        return removed
+
+    async def stop(self) -> None:
+        self._subscriptions.clear()
+        self.thresholds = ThresholdIndex()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def poll_once(
+        self,
+        plans: Sequence[FilterPlan] = (),
+        tickers: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, MarketSnapshot], List[str]]:
+        """Fetch due symbols; ``plans`` decide which symbols count as near an alert."""
+        if tickers is None:
+            tickers = await asyncio.to_thread(self.load_tickers)
+        due = self.planner.select(tickers)
+        snapshots, errors = await self.engine.fetch(due, self.lookback(plans))
+        self.store.update(snapshots, tickers, self.indicators)
+        self.indicators.retain(self.store.snapshots())
+        near = await self.engine.offload(self._prepare, list(plans), self.thresholds.fields())
+        self.planner.observe(snapshots, due, near + list(self.thresholds.symbols()))
+        return snapshots, errors
+
+    def lookback(self, plans: Sequence[FilterPlan]) -> int:
+        """Bars the deepest of ``plans`` and the indexed thresholds need, with warm-up."""
+        warmup = self.engine.warmup
+        return max(
+            [plan.lookback(warmup) for plan in plans]
+            + [ref.lookback(warmup) for ref in self.thresholds.fields()],
+            default=1,
+        )
+
+    async def tick(
+        self,
+        plans: Dict[str, FilterPlan],
+        tickers: Optional[List[str]] = None,
+    ) -> Tuple[List[str], Dict[str, Evaluation]]:
+        """Poll once and evaluate every plan against the refreshed universe."""
+        _, fetch_errors = await self.poll_once(list(plans.values()), tickers)
+        evaluations: Dict[str, Evaluation] = {}
+        for key, plan in plans.items():
+            evaluations[key] = await self.engine.evaluate(
+                self.store.snapshots(), plan, matrix=self.store.matrix
+            )
+        return fetch_errors, evaluations
+
+    def crossed_thresholds(self) -> Dict[Hashable, List[str]]:
+        """Pop indexed alerts satisfied by the latest snapshot, with the symbols that fired."""
+        matrix = self.store.matrix
+        fired: Dict[Hashable, List[str]] = {}
+        for symbol, ref in self.thresholds.buckets():
+            row = matrix.row(symbol)
+            if row is None:
+                continue
+            value = float(matrix.column(ref)[row])
+            for key in self.thresholds.crossed(symbol, ref.name, value):
+                fired.setdefault(key, []).append(symbol)
+        return fired
+
+    def _prepare(self, plans: Sequence[FilterPlan], refs: Sequence[FieldRef]) -> List[str]:
+        """Fill the columns the threshold checks read and return the symbols near ``plans``.
+
+        Runs on the engine's executor. The columns stay cached on the matrix,
+        so evaluating the plans afterwards does not compute them again.
+        """
+        matrix = self.store.matrix
+        for ref in refs:
+            matrix.column(ref)
+        return self._near(plans)
+
+    def _near(self, plans: Sequence[FilterPlan]) -> List[str]:
+        matrix = self.store.matrix
+        if not len(matrix) or not plans:
+            return []
+        near = np.zeros(len(matrix), dtype=bool)
+        for plan in plans:
+            near |= matrix.distance(plan) <= self.planner.proximity
+        return [symbol for symbol, flag in zip(matrix.symbols, near) if flag]
+
+    async def _notify(
+        self,
+        subscription: Subscription,
+        results: List[ScreeningResult],
+        errors: List[str],
+    ) -> None:
+        try:
+            await subscription.on_tick(results, errors)
+        except Exception:  # noqa: BLE001 - one chat must not stop the poller
+            logger.exception("Subscription %s failed to handle tick", subscription.key)
+
+    async def _dispatch(
+        self,
+        group: List[Subscription],
+        results: List[ScreeningResult],
+        errors: List[str],
+    ) -> None:
+        await asyncio.gather(
+            *(
+                self._notify(subscription, *subscription.scoped(results, errors))
+                for subscription in group
+                if self._subscriptions.get(subscription.key) is subscription
+            )
+        )
+
+    async def _fire_thresholds(self, fetch_errors: List[str]) -> None:
+        """Notify indexed alerts that fired or whose symbols failed to fetch this tick."""
+        fired = self.crossed_thresholds()
+        notices = []
+        for subscription in list(self._subscriptions.values()):
+            if not subscription.indexed:
+                continue
+            symbols = fired.get(subscription.key, [])
+            _, errors = subscription.scoped([], fetch_errors)
+            if not symbols and not errors:
+                continue
+            results = [
+                ScreeningResult(symbol=symbol, passed=True, snapshot=self.store.get(symbol))
+                for symbol in symbols
+            ]
+            notices.append(self._notify(subscription, results, errors))
+        await asyncio.gather(*notices)
+
+    async def _run(self) -> None:
+        while self._subscriptions:
+            started = time.monotonic()
+            groups = self.groups()
+            scope = self.scope()
+            try:
+                fetch_errors, evaluations = await self.tick(
+                    {key: group[0].plan for key, group in groups.items()}, scope
+                )
+            except Exception as exc:  # noqa: BLE001 - keep polling on transient failures
+                logger.exception("Market poll failed")
+                for subscription in list(self._subscriptions.values()):
+                    await self._notify(subscription, [], [f"Gagal load ticker BEI: {exc}"])
+            else:
+                for key, group in groups.items():
+                    results, errors = evaluations[key]
+                    await self._dispatch(group, results, fetch_errors + errors)
+                await self._fire_thresholds(fetch_errors)
+            await self._wait(started, scoped=scope is not None)
+
+    async def _wait(self, started: float, scoped: bool = False) -> None:
+        fast = scoped and self.scoped_interval is not None
+        if fast and (self.calendar is None or self.calendar.is_polling()):
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, self.scoped_interval - elapsed))
+            return
+        if self.calendar is None:
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, self.interval - elapsed))
+            return
+        while True:
+            delay = self.calendar.seconds_until_next_poll()
+            if delay <= _MAX_SLEEP_SECONDS:
+                await asyncio.sleep(delay)
+                return
+            await asyncio.sleep(_MAX_SLEEP_SECONDS)
@@ -0,0 +1,112 @@
+"""Per-symbol polling priority for the shared poller."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from bot.core.market_data import MarketSnapshot
+
+
+@dataclass
+class SymbolPriority:
+    interval: int = 1
+    due: int = 0
+    last_timestamp: Optional[int] = None
+    hot: bool = False
+
+
+class PollPlanner:
+    """Choose which symbols to fetch on each tick.
+
+    Symbols near an active alert (``hot``) or that printed a new bar with volume
+    are fetched every tick. Each quiet poll doubles a symbol's interval, up to
+    ``max_interval`` ticks. At most ``budget`` symbols are fetched per tick
+    (0 = no cap): hot symbols first, together with any symbol left waiting for
+    ``max_interval`` extra ticks so nothing starves, then never-fetched ones,
+    then the most overdue. Whatever does not fit stays due for the next tick.
+    """
+
+    def __init__(
+        self,
+        budget: int = 0,
+        max_interval: int = 8,
+        proximity: float = 0.02,
+        activity_bars: int = 5,
+    ) -> None:
+        self.budget = max(0, budget)
+        self.max_interval = max(1, max_interval)
+        self.proximity = proximity
+        self.activity_bars = max(1, activity_bars)
+        self.tick = 0
+        self._states: Dict[str, SymbolPriority] = {}
+
+    def state(self, symbol: str) -> SymbolPriority:
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = SymbolPriority(due=self.tick)
+        return state
+
+    def select(self, symbols: Sequence[str]) -> List[str]:
+        """Advance one tick and return the symbols to fetch, in universe order."""
+        self.tick += 1
+        universe = list(dict.fromkeys(symbols))
+        for symbol in set(self._states) - set(universe):
+            del self._states[symbol]
+        due = [symbol for symbol in universe if self.state(symbol).due <= self.tick]
+        if not self.budget or len(due) <= self.budget:
+            return due
+        order = {symbol: position for position, symbol in enumerate(universe)}
+        ranked = sorted(
+            due,
+            key=lambda symbol: (
+                not self._states[symbol].hot
+                and self.tick - self._states[symbol].due < self.max_interval,
+                self._states[symbol].last_timestamp is not None,
+                self._states[symbol].due,
+                order[symbol],
+            ),
+        )
+        chosen = set(ranked[: self.budget])
+        return [symbol for symbol in universe if symbol in chosen]
+
+    def _active(self, state: SymbolPriority, snapshot: MarketSnapshot) -> bool:
+        candles = snapshot.candles
+        last = candles.last_timestamp
+        if last is None or last == state.last_timestamp:
+            return False
+        return bool(candles.volume[-self.activity_bars :].sum() > 0)
+
+    def observe(
+        self,
+        fetched: Dict[str, MarketSnapshot],
+        attempted: Iterable[str],
+        near: Iterable[str] = (),
+    ) -> None:
+        """Update priorities after a tick.
+
+        ``attempted`` are the symbols fetched this tick, ``fetched`` the ones
+        that returned data and ``near`` the symbols close to an alert condition.
+        """
+        near = set(near)
+        attempted = set(attempted)
+        for symbol in attempted:
+            state = self.state(symbol)
+            snapshot = fetched.get(symbol)
+            active = snapshot is not None and self._active(state, snapshot)
+            if snapshot is not None:
+                state.last_timestamp = snapshot.candles.last_timestamp
+            state.hot = symbol in near
+            if active or state.hot:
+                state.interval = 1
+            else:
+                state.interval = min(state.interval * 2, self.max_interval)
+            state.due = self.tick + state.interval
+        for symbol, state in self._states.items():
+            if symbol in attempted:
+                continue
+            hot = symbol in near
+            if hot and not state.hot:
+                state.interval = 1
+                state.due = min(state.due, self.tick + 1)
+            state.hot = hot
@@ -0,0 +1,217 @@
+"""Columnar OHLCV storage backed by contiguous NumPy arrays."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from bot.core.indicators import Candle
+
+_NS_PER_MINUTE = 60_000_000_000
+
+
+@dataclass(frozen=True, eq=False)
+class CandleSeries:
+    """OHLCV bars as float64 columns plus int64 epoch-nanosecond timestamps."""
+
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        values = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype=np.int64), values, values, values, values, values)
+
+    @classmethod
+    def from_frame(cls, frame: Any) -> "CandleSeries":
+        """Build from a yfinance-style frame without materialising rows."""
+        index = frame.index
+        if hasattr(index, "asi8"):
+            if hasattr(index, "as_unit"):
+                index = index.as_unit("ns")
+            timestamps = np.asarray(index.asi8, dtype=np.int64)
+        else:
+            timestamps = np.arange(len(index), dtype=np.int64) * _NS_PER_MINUTE
+        return cls(
+            timestamps=timestamps,
+            open=frame["Open"].to_numpy(dtype=np.float64),
+            high=frame["High"].to_numpy(dtype=np.float64),
+            low=frame["Low"].to_numpy(dtype=np.float64),
+            close=frame["Close"].to_numpy(dtype=np.float64),
+            volume=frame["Volume"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def from_candles(
+        cls,
+        candles: Sequence[Candle],
+        timestamps: Optional[Sequence[int]] = None,
+    ) -> "CandleSeries":
+        if timestamps is None:
+            timestamps = np.arange(len(candles), dtype=np.int64) * _NS_PER_MINUTE
+        return cls(
+            timestamps=np.asarray(timestamps, dtype=np.int64),
+            open=np.fromiter((c.open for c in candles), dtype=np.float64, count=len(candles)),
+            high=np.fromiter((c.high for c in candles), dtype=np.float64, count=len(candles)),
+            low=np.fromiter((c.low for c in candles), dtype=np.float64, count=len(candles)),
+            close=np.fromiter((c.close for c in candles), dtype=np.float64, count=len(candles)),
+            volume=np.fromiter((c.volume for c in candles), dtype=np.float64, count=len(candles)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __bool__(self) -> bool:
+        return len(self.close) > 0
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Candle, "CandleSeries"]:
+        if isinstance(key, slice):
+            return CandleSeries(
+                timestamps=self.timestamps[key],
+                open=self.open[key],
+                high=self.high[key],
+                low=self.low[key],
+                close=self.close[key],
+                volume=self.volume[key],
+            )
+        return Candle(
+            open=float(self.open[key]),
+            high=float(self.high[key]),
+            low=float(self.low[key]),
+            close=float(self.close[key]),
+            volume=float(self.volume[key]),
+        )
+
+    def __iter__(self) -> Iterator[Candle]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.timestamps[-1]) if len(self.timestamps) else None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes
+            for column in (self.timestamps, self.open, self.high, self.low, self.close, self.volume)
+        )
+
+    def merge(self, newer: "CandleSeries") -> "CandleSeries":
+        """Append ``newer``; bars at or after its first timestamp are replaced by it."""
+        if not len(newer):
+            return self
+        if not len(self):
+            return newer
+        keep = int(np.searchsorted(self.timestamps, newer.timestamps[0], side="left"))
+        return CandleSeries(
+            timestamps=np.concatenate((self.timestamps[:keep], newer.timestamps)),
+            open=np.concatenate((self.open[:keep], newer.open)),
+            high=np.concatenate((self.high[:keep], newer.high)),
+            low=np.concatenate((self.low[:keep], newer.low)),
+            close=np.concatenate((self.close[:keep], newer.close)),
+            volume=np.concatenate((self.volume[:keep], newer.volume)),
+        )
+
+    def since(self, timestamp: int) -> "CandleSeries":
+        start = int(np.searchsorted(self.timestamps, timestamp, side="left"))
+        return self[start:] if start else self
+
+    def deduplicated(self) -> "CandleSeries":
+        """Sort by time and keep the last bar for each timestamp."""
+        if len(self) < 2:
+            return self
+        order = np.argsort(self.timestamps, kind="stable")
+        ordered = self.timestamps[order]
+        last = np.append(ordered[1:] != ordered[:-1], True)
+        if last.all() and (order == np.arange(len(order))).all():
+            return self
+        index = order[last]
+        return CandleSeries(
+            timestamps=self.timestamps[index],
+            open=self.open[index],
+            high=self.high[index],
+            low=self.low[index],
+            close=self.close[index],
+            volume=self.volume[index],
+        )
+
+
+class CandleRing:
+    """Fixed-capacity OHLCV ring buffer keeping the newest ``capacity`` bars.
+
+    Columns are preallocated once, so appending a poll's tail neither grows
+    nor reallocates them; ``series`` copies the bars out in time order.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, capacity)
+        self._timestamps = np.empty(self.capacity, dtype=np.int64)
+        # open, high, low, close, volume as rows of one block.
+        self._values = np.empty((5, self.capacity), dtype=np.float64)
+        self._start = 0
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def _order(self) -> np.ndarray:
+        return (self._start + np.arange(self._length)) % self.capacity
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if not self._length:
+            return None
+        return int(self._timestamps[(self._start + self._length - 1) % self.capacity])
+
+    def _position(self, timestamp: int) -> int:
+        """Number of bars older than ``timestamp``."""
+        head = self._timestamps[self._start : min(self._start + self._length, self.capacity)]
+        wrapped = self._timestamps[: self._length - len(head)]
+        if len(wrapped) and wrapped[0] < timestamp:
+            return len(head) + int(np.searchsorted(wrapped, timestamp, side="left"))
+        return int(np.searchsorted(head, timestamp, side="left"))
+
+    def extend(self, newer: CandleSeries) -> None:
+        """Append time-ordered bars; bars at or after their first timestamp are replaced."""
+        if not len(newer):
+            return
+        if len(newer) >= self.capacity:
+            newer = newer[-self.capacity :]
+            self._start, self._length = 0, 0
+        else:
+            self._length = self._position(int(newer.timestamps[0]))
+        count = len(newer)
+        slots = (self._start + self._length + np.arange(count)) % self.capacity
+        self._timestamps[slots] = newer.timestamps
+        self._values[:, slots] = (newer.open, newer.high, newer.low, newer.close, newer.volume)
+        overflow = max(0, self._length + count - self.capacity)
+        self._start = (self._start + overflow) % self.capacity
+        self._length += count - overflow
+
+    def series(self) -> CandleSeries:
+        order = self._order()
+        values = self._values[:, order]
+        return CandleSeries(self._timestamps[order], *values)
+
+    def resize(self, capacity: int) -> None:
+        """Change the capacity, keeping the newest bars that still fit."""
+        capacity = max(1, capacity)
+        if capacity == self.capacity:
+            return
+        kept = self.series()
+        self.capacity = capacity
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((5, capacity), dtype=np.float64)
+        self._start, self._length = 0, 0
+        self.extend(kept)
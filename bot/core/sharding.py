@@ -0,0 +1,259 @@
+"""Shard the ticker universe across worker processes.
+
+Each worker owns a provider (and so its candle cache), its indicator state and
+its snapshots for the symbols hashed to it. The main process only sends ticker
+lists and filter conditions and receives ``(symbol, passed)`` pairs and error
+strings back, so candles are never pickled between processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import zlib
+
+from bot.core.engine import AsyncScreeningEngine, ScreeningResult
+from bot.core.filters import (
+    DEFAULT_WARMUP_BARS,
+    FilterCondition,
+    FilterPlan,
+    compile_conditions,
+)
+from bot.core.health import CircuitBreaker
+from bot.core.market_data import MarketDataProvider
+from bot.core.market_hours import MarketCalendar
+from bot.core.poller import Evaluation, MarketPoller, TickerLoader
+from bot.core.priority import PollPlanner
+
+CompactEvaluation = Tuple[List[Tuple[str, bool]], List[str]]
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    """Everything a worker needs to build its engine; must be picklable."""
+
+    provider_factory: Callable[[], MarketDataProvider]
+    concurrency: int = 16
+    timeout: float = 20.0
+    failure_cooldown: float = 30.0
+    no_data_cooldown: float = 900.0
+    warmup: int = DEFAULT_WARMUP_BARS
+    planner: Dict[str, Any] = field(default_factory=dict)
+
+
+def shard_of(symbol: str, shards: int) -> int:
+    """Stable across restarts, so a worker keeps warming the same symbols."""
+    return zlib.crc32(symbol.encode("utf-8")) % shards
+
+
+def partition(symbols: Sequence[str], shards: int) -> List[List[str]]:
+    parts: List[List[str]] = [[] for _ in range(shards)]
+    for symbol in dict.fromkeys(symbols):
+        parts[shard_of(symbol, shards)].append(symbol)
+    return parts
+
+
+def _compact(evaluation: Evaluation) -> CompactEvaluation:
+    results, errors = evaluation
+    return [(result.symbol, result.passed) for result in results], errors
+
+
+class _Worker:
+    """State living inside one worker process."""
+
+    def __init__(self, config: ShardConfig) -> None:
+        self.engine = AsyncScreeningEngine(
+            config.provider_factory(),
+            concurrency=config.concurrency,
+            timeout=config.timeout,
+            breaker=CircuitBreaker(
+                base_cooldown=config.failure_cooldown,
+                negative_cooldown=config.no_data_cooldown,
+            ),
+            warmup=config.warmup,
+        )
+        self.poller = MarketPoller(
+            self.engine, list, 0, planner=PollPlanner(**config.planner)
+        )
+
+    async def run(
+        self, tickers: List[str], conditions: Tuple[FilterCondition, ...]
+    ) -> CompactEvaluation:
+        return _compact(await self.engine.run(tickers, compile_conditions(conditions)))
+
+    async def tick(
+        self,
+        tickers: List[str],
+        plans: Dict[str, Tuple[FilterCondition, ...]],
+    ) -> Tuple[List[str], Dict[str, CompactEvaluation]]:
+        compiled = {key: compile_conditions(conditions) for key, conditions in plans.items()}
+        fetch_errors, evaluations = await self.poller.tick(compiled, tickers)
+        return fetch_errors, {key: _compact(value) for key, value in evaluations.items()}
+
+
+def _worker_main(connection: Any, config: ShardConfig) -> None:
+    loop = asyncio.new_event_loop()
+    worker = _Worker(config)
+    try:
+        while True:
+            try:
+                command, args = connection.recv()
+            except EOFError:
+                break
+            if command == "stop":
+                break
+            try:
+                reply = loop.run_until_complete(getattr(worker, command)(*args))
+            except Exception as exc:  # noqa: BLE001 - report to the main process
+                connection.send(("error", f"{type(exc).__name__}: {exc}"))
+            else:
+                connection.send(("ok", reply))
+    finally:
+        worker.engine.close()
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+        connection.close()
+
+
+class ShardError(RuntimeError):
+    """Raised when a worker process fails a command."""
+
+
+class _ShardHandle:
+    def __init__(self, context: Any, config: ShardConfig, index: int) -> None:
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child, config),
+            name=f"screening-shard-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self._lock = threading.Lock()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def call(self, command: str, *args: Any) -> Any:
+        with self._lock:
+            try:
+                self.connection.send((command, args))
+                status, reply = self.connection.recv()
+            except (EOFError, OSError) as exc:
+                raise ShardError(f"{self.process.name} exited: {exc}") from None
+        if status != "ok":
+            raise ShardError(reply)
+        return reply
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.connection.send(("stop", ()))
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+
+
+class ShardedScreeningEngine:
+    """Drop-in for ``AsyncScreeningEngine.run`` backed by ``shards`` processes."""
+
+    def __init__(self, config: ShardConfig, shards: int) -> None:
+        self.config = config
+        self.shards = max(1, shards)
+        self._handles: Optional[List[_ShardHandle]] = None
+
+    def _get_handles(self) -> List[_ShardHandle]:
+        """Start the workers on first use and respawn any that died."""
+        context = multiprocessing.get_context("spawn")
+        if self._handles is None:
+            self._handles = [
+                _ShardHandle(context, self.config, index) for index in range(self.shards)
+            ]
+        for index, handle in enumerate(self._handles):
+            if not handle.alive():
+                handle.close()
+                self._handles[index] = _ShardHandle(context, self.config, index)
+        return self._handles
+
+    async def _gather(self, command: str, payloads: List[Tuple[Any, ...]]) -> List[Any]:
+        handles = self._get_handles()
+        return await asyncio.gather(
+            *(
+                asyncio.to_thread(handle.call, command, *payload)
+                for handle, payload in zip(handles, payloads)
+            )
+        )
+
+    async def run(
+        self,
+        tickers: Sequence[str],
+        conditions: Any,
+    ) -> Tuple[List[ScreeningResult], List[str]]:
+        plan = compile_conditions(conditions)
+        parts = partition(list(tickers), self.shards)
+        replies = await self._gather("run", [(part, plan.conditions) for part in parts])
+        results: List[ScreeningResult] = []
+        errors: List[str] = []
+        for pairs, shard_errors in replies:
+            results.extend(ScreeningResult(symbol=s, passed=p) for s, p in pairs)
+            errors.extend(shard_errors)
+        return results, errors
+
+    async def tick(
+        self,
+        tickers: Sequence[str],
+        plans: Dict[str, FilterPlan],
+    ) -> Tuple[List[str], Dict[str, Evaluation]]:
+        conditions = {key: plan.conditions for key, plan in plans.items()}
+        parts = partition(list(tickers), self.shards)
+        replies = await self._gather("tick", [(part, conditions) for part in parts])
+        fetch_errors: List[str] = []
+        evaluations: Dict[str, Evaluation] = {key: ([], []) for key in plans}
+        for shard_fetch_errors, shard_evaluations in replies:
+            fetch_errors.extend(shard_fetch_errors)
+            for key, (pairs, errors) in shard_evaluations.items():
+                results, merged_errors = evaluations[key]
+                results.extend(ScreeningResult(symbol=s, passed=p) for s, p in pairs)
+                merged_errors.extend(errors)
+        return fetch_errors, evaluations
+
+    def close(self) -> None:
+        handles, self._handles = self._handles, None
+        for handle in handles or []:
+            handle.close()
+
+
+class ShardedPoller(MarketPoller):
+    """``MarketPoller`` whose ticks are fetched and evaluated by the shard workers."""
+
+    # Snapshots live in the workers, so threshold alerts are evaluated as plans there.
+    index_thresholds = False
+
+    def __init__(
+        self,
+        engine: ShardedScreeningEngine,
+        load_tickers: TickerLoader,
+        interval: float,
+        calendar: Optional[MarketCalendar] = None,
+        scoped_interval: Optional[float] = None,
+    ) -> None:
+        super().__init__(  # type: ignore[arg-type]
+            engine, load_tickers, interval, calendar, scoped_interval=scoped_interval
+        )
+        self.sharded = engine
+
+    async def tick(
+        self,
+        plans: Dict[str, FilterPlan],
+        tickers: Optional[List[str]] = None,
+    ) -> Tuple[List[str], Dict[str, Evaluation]]:
+        if tickers is None:
+            tickers = await asyncio.to_thread(self.load_tickers)
+        return await self.sharded.tick(tickers, plans)
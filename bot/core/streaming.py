@@ -0,0 +1,407 @@
+"""Incremental indicators updated in O(1) per bar.
+
+Every indicator keeps the state *before* the newest bar plus the state
+*including* it, so ``push`` appends a closed bar and ``revise`` recomputes the
+in-progress bar from the saved state without touching older history. Streams
+warm up from the last ``warmup`` bars only; SMA/ROC are exact, recursive
+indicators agree with the batch versions in ``bot.core.indicators`` to within
+``(1 - alpha) ** warmup``.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from bot.core.series import CandleSeries
+
+IndicatorKey = Tuple[Hashable, ...]
+
+_RESUM_EVERY = 1024
+
+
+class StreamingIndicator:
+    """Base class: subclasses implement ``_step(state, bar) -> (state, value)``."""
+
+    def __init__(self, history: int = 64) -> None:
+        self._base = self._initial()
+        self._state = self._base
+        self.history: Deque[Optional[float]] = deque(maxlen=max(1, history))
+
+    def _initial(self) -> tuple:
+        raise NotImplementedError
+
+    def _step(self, state: tuple, bar: tuple) -> Tuple[tuple, Optional[float]]:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.history[-1] if self.history else None
+
+    def push(self, *bar: float) -> Optional[float]:
+        self._base = self._state
+        self._state, value = self._step(self._base, bar)
+        self.history.append(value)
+        return value
+
+    def revise(self, *bar: float) -> Optional[float]:
+        if not self.history:
+            return self.push(*bar)
+        self._state, value = self._step(self._base, bar)
+        self.history[-1] = value
+        return value
+
+    def lookback(self, offset: int) -> Optional[float]:
+        if offset >= len(self.history):
+            return None
+        return self.history[-1 - offset]
+
+
+class StreamingSMA(StreamingIndicator):
+    def __init__(self, period: int, history: int = 64) -> None:
+        self.period = period
+        self._window: Deque[float] = deque()
+        self._total = 0.0
+        self._pushes = 0
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return ()
+
+    def _value(self) -> Optional[float]:
+        if self.period <= 0 or len(self._window) < self.period:
+            return None
+        return self._total / self.period
+
+    def push(self, *bar: float) -> Optional[float]:
+        value = bar[0]
+        self._window.append(value)
+        self._total += value
+        if len(self._window) > self.period:
+            self._total -= self._window.popleft()
+        self._pushes += 1
+        if self._pushes % _RESUM_EVERY == 0:
+            self._total = float(sum(self._window))
+        result = self._value()
+        self.history.append(result)
+        return result
+
+    def revise(self, *bar: float) -> Optional[float]:
+        if not self._window:
+            return self.push(*bar)
+        self._total += bar[0] - self._window[-1]
+        self._window[-1] = bar[0]
+        result = self._value()
+        self.history[-1] = result
+        return result
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA seeded with the SMA of the first ``period`` values."""
+
+    def __init__(self, period: int, history: int = 64) -> None:
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return (0, 0.0, None)
+
+    def _step(self, state: tuple, bar: tuple) -> Tuple[tuple, Optional[float]]:
+        count, seed_total, value = state
+        count += 1
+        if value is None:
+            seed_total += bar[0]
+            if count == self.period:
+                value = seed_total / self.period
+        else:
+            value += self.alpha * (bar[0] - value)
+        return (count, seed_total, value), value
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI."""
+
+    def __init__(self, period: int = 14, history: int = 64) -> None:
+        self.period = period
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return (None, 0, 0.0, 0.0)
+
+    def _step(self, state: tuple, bar: tuple) -> Tuple[tuple, Optional[float]]:
+        last, changes, avg_gain, avg_loss = state
+        close = bar[0]
+        if last is None:
+            return (close, 0, 0.0, 0.0), None
+        change = close - last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        changes += 1
+        if changes <= self.period:
+            avg_gain += gain / self.period
+            avg_loss += loss / self.period
+        else:
+            avg_gain += (gain - avg_gain) / self.period
+            avg_loss += (loss - avg_loss) / self.period
+        state = (close, changes, avg_gain, avg_loss)
+        if changes < self.period:
+            return state, None
+        if avg_loss == 0:
+            return state, 100.0
+        return state, 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class StreamingROC(StreamingIndicator):
+    def __init__(self, period: int = 14, history: int = 64) -> None:
+        self.period = period
+        self._window: Deque[float] = deque(maxlen=period + 1)
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return ()
+
+    def _value(self) -> Optional[float]:
+        if len(self._window) <= self.period or self._window[0] == 0:
+            return None
+        return (self._window[-1] - self._window[0]) / self._window[0] * 100
+
+    def push(self, *bar: float) -> Optional[float]:
+        self._window.append(bar[0])
+        result = self._value()
+        self.history.append(result)
+        return result
+
+    def revise(self, *bar: float) -> Optional[float]:
+        if not self._window:
+            return self.push(*bar)
+        self._window[-1] = bar[0]
+        result = self._value()
+        self.history[-1] = result
+        return result
+
+
+class StreamingADX(StreamingIndicator):
+    """Wilder ADX over (high, low, close) bars."""
+
+    def __init__(self, period: int = 14, history: int = 64) -> None:
+        self.period = period
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return (None, 0, 0.0, 0.0, 0.0, 0.0)
+
+    def _step(self, state: tuple, bar: tuple) -> Tuple[tuple, Optional[float]]:
+        previous, changes, atr, plus_avg, minus_avg, adx = state
+        high, low, close = bar
+        if previous is None:
+            return ((high, low, close), 0, 0.0, 0.0, 0.0, 0.0), None
+        prev_high, prev_low, prev_close = previous
+        period = self.period
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        up_move, down_move = high - prev_high, prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        changes += 1
+        if changes <= period:
+            atr += true_range / period
+            plus_avg += plus_dm / period
+            minus_avg += minus_dm / period
+        else:
+            atr += (true_range - atr) / period
+            plus_avg += (plus_dm - plus_avg) / period
+            minus_avg += (minus_dm - minus_avg) / period
+        value = None
+        if changes >= period:
+            plus_di = 100 * plus_avg / atr if atr > 0 else 0.0
+            minus_di = 100 * minus_avg / atr if atr > 0 else 0.0
+            dx = 100 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
+            dx_count = changes - period + 1
+            if dx_count <= period:
+                adx += dx / period
+                if dx_count == period:
+                    value = adx
+            else:
+                adx += (dx - adx) / period
+                value = adx
+        return ((high, low, close), changes, atr, plus_avg, minus_avg, adx), value
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal and histogram from two EMAs plus a signal EMA."""
+
+    def __init__(
+        self,
+        fast: int = 12,
+        slow: int = 26,
+        signal: int = 9,
+        history: int = 64,
+    ) -> None:
+        self.slow = slow
+        self.signal_period = signal
+        self._fast = StreamingEMA(fast, history=1)
+        self._slow = StreamingEMA(slow, history=1)
+        self._signal = StreamingEMA(signal, history=1)
+        self._count = 0
+        self.signal_history: Deque[Optional[float]] = deque(maxlen=max(1, history))
+        self.hist_history: Deque[Optional[float]] = deque(maxlen=max(1, history))
+        super().__init__(history)
+
+    def _initial(self) -> tuple:
+        return ()
+
+    def _outputs(self, fast: Optional[float], slow: Optional[float], signal_pushed: bool) -> tuple:
+        if fast is None or slow is None:
+            return None, None, None
+        line = fast - slow
+        signal = self._signal.value if signal_pushed else None
+        if self._count < self.slow + self.signal_period:
+            return None, None, None
+        hist = line - signal if signal is not None else None
+        return line, signal, hist
+
+    def _record(self, outputs: tuple, replace: bool) -> Optional[float]:
+        for target, value in zip((self.history, self.signal_history, self.hist_history), outputs):
+            if replace and target:
+                target[-1] = value
+            else:
+                target.append(value)
+        return outputs[0]
+
+    def push(self, *bar: float) -> Optional[float]:
+        self._count += 1
+        fast, slow = self._fast.push(bar[0]), self._slow.push(bar[0])
+        pushed = slow is not None
+        if pushed:
+            self._signal.push(fast - slow)
+        return self._record(self._outputs(fast, slow, pushed), replace=False)
+
+    def revise(self, *bar: float) -> Optional[float]:
+        if not self.history:
+            return self.push(*bar)
+        fast, slow = self._fast.revise(bar[0]), self._slow.revise(bar[0])
+        pushed = slow is not None
+        if pushed:
+            self._signal.revise(fast - slow)
+        return self._record(self._outputs(fast, slow, pushed), replace=True)
+
+    def lookback(self, offset: int, output: str = "macd") -> Optional[float]:
+        history = {
+            "macd": self.history,
+            "signal": self.signal_history,
+            "hist": self.hist_history,
+        }[output]
+        if offset >= len(history):
+            return None
+        return history[-1 - offset]
+
+
+def create_indicator(key: IndicatorKey, history: int = 64) -> StreamingIndicator:
+    """Build a stream for an indicator key such as ``("ema", 20)`` or ``("sma", "volume", 20)``."""
+    name = key[0]
+    if name == "sma":
+        return StreamingSMA(key[2], history=history)
+    if name == "ema":
+        return StreamingEMA(key[1], history=history)
+    if name == "rsi":
+        return StreamingRSI(key[1], history=history)
+    if name == "roc":
+        return StreamingROC(key[1], history=history)
+    if name == "adx":
+        return StreamingADX(key[1], history=history)
+    if name == "macd":
+        return StreamingMACD(history=history)
+    raise ValueError(f"Unknown indicator: {key}")
+
+
+def _bar_columns(key: IndicatorKey, series: CandleSeries) -> Tuple[np.ndarray, ...]:
+    name = key[0]
+    if name == "adx":
+        return series.high, series.low, series.close
+    if name == "sma" and key[1] == "volume":
+        return (series.volume,)
+    return (series.close,)
+
+
+class IndicatorStream:
+    """One streaming indicator kept in step with a symbol's candle series."""
+
+    def __init__(self, key: IndicatorKey, warmup: int, history: int) -> None:
+        self.key = key
+        self.warmup = warmup
+        self.history = history
+        self.indicator = create_indicator(key, history)
+        self.last_timestamp: Optional[int] = None
+
+    def _feed(self, series: CandleSeries, start: int, revise_first: bool) -> None:
+        columns = _bar_columns(self.key, series)
+        for index in range(start, len(series)):
+            bar = tuple(float(column[index]) for column in columns)
+            if revise_first and index == start:
+                self.indicator.revise(*bar)
+            else:
+                self.indicator.push(*bar)
+        self.last_timestamp = series.last_timestamp
+
+    def sync(self, series: CandleSeries) -> None:
+        """Consume bars newer than the last seen one, revising the last seen bar."""
+        if not len(series):
+            return
+        if self.last_timestamp is not None:
+            position = int(np.searchsorted(series.timestamps, self.last_timestamp))
+            if position < len(series) and series.timestamps[position] == self.last_timestamp:
+                self._feed(series, position, revise_first=True)
+                return
+        self.indicator = create_indicator(self.key, self.history)
+        self._feed(series, max(0, len(series) - self.warmup), revise_first=False)
+
+    def value(self, offset: int = 0, output: Optional[str] = None) -> Optional[float]:
+        if isinstance(self.indicator, StreamingMACD):
+            return self.indicator.lookback(offset, output or "macd")
+        return self.indicator.lookback(offset)
+
+
+class SymbolIndicators:
+    """Streaming indicator state for one symbol, created lazily per key."""
+
+    def __init__(self, warmup: int = 500, history: int = 64) -> None:
+        self.warmup = warmup
+        self.history = history
+        self._streams: Dict[IndicatorKey, IndicatorStream] = {}
+
+    def value(self, key: IndicatorKey, series: CandleSeries, offset: int = 0) -> Optional[float]:
+        """Latest (or ``offset`` bars back) value; MACD keys carry the output name."""
+        output = None
+        if key[0] == "macd":
+            key, output = ("macd",), str(key[1])
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = IndicatorStream(key, self.warmup, self.history)
+            self._streams[key] = stream
+        stream.sync(series)
+        return stream.value(offset, output)
+
+
+class IndicatorRegistry:
+    """Per-symbol streaming indicator state shared across polls."""
+
+    def __init__(self, warmup: int = 500, history: int = 64) -> None:
+        self.warmup = warmup
+        self.history = history
+        self._symbols: Dict[str, SymbolIndicators] = {}
+
+    def for_symbol(self, symbol: str) -> SymbolIndicators:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = SymbolIndicators(self.warmup, self.history)
+            self._symbols[symbol] = state
+        return state
+
+    def retain(self, symbols: Iterable[str]) -> None:
+        keep = set(symbols)
+        for symbol in [symbol for symbol in self._symbols if symbol not in keep]:
+            del self._symbols[symbol]
+
+    def __len__(self) -> int:
+        return len(self._symbols)
@@ -0,0 +1,157 @@
+"""Bisection index for one-shot single-field threshold alerts."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from bot.core.expressions import Field, Number
+from bot.core.filters import FieldRef, FilterPlan
+
+_FLIPPED = {">": "<", ">=": "<=", "<": ">", "<=": ">="}
+
+
+@dataclass(frozen=True)
+class Threshold:
+    """``<field> <operator> <value>`` with the field on the left."""
+
+    ref: FieldRef
+    operator: str
+    value: float
+
+
+def threshold_of(plan: FilterPlan) -> Optional[Threshold]:
+    """The plan's threshold if it is exactly one ``field <op> number`` comparison."""
+    if len(plan.predicates) != 1:
+        return None
+    predicate = plan.predicates[0]
+    operator = predicate.operator
+    if operator not in _FLIPPED:
+        return None
+    left, right = predicate.left, predicate.right
+    if isinstance(left, Number) and isinstance(right, Field):
+        left, right, operator = right, left, _FLIPPED[operator]
+    if not isinstance(left, Field) or not isinstance(right, Number):
+        return None
+    return Threshold(ref=left.ref, operator=operator, value=float(right.value))
+
+
+class _Side:
+    """Thresholds for one operator, as parallel lists sorted by value."""
+
+    __slots__ = ("values", "keys")
+
+    def __init__(self) -> None:
+        self.values: List[Tuple[float, int]] = []
+        self.keys: List[Hashable] = []
+
+    def add(self, value: float, sequence: int, key: Hashable) -> None:
+        entry = (value, sequence)
+        position = bisect_right(self.values, entry)
+        self.values.insert(position, entry)
+        self.keys.insert(position, key)
+
+    def remove(self, value: float, key: Hashable) -> None:
+        position = bisect_left(self.values, (value, -1))
+        while position < len(self.values) and self.values[position][0] == value:
+            if self.keys[position] == key:
+                del self.values[position]
+                del self.keys[position]
+                return
+            position += 1
+
+    def pop(self, start: int, stop: int) -> List[Hashable]:
+        keys = self.keys[start:stop]
+        del self.values[start:stop]
+        del self.keys[start:stop]
+        return keys
+
+
+class ThresholdIndex:
+    """Thresholds per ``(symbol, field)`` kept sorted, one list per operator.
+
+    ``crossed`` finds every threshold satisfied by a new value with one
+    bisection per operator and removes them in a single slice, so the cost of
+    a price update depends on how many alerts fire, not how many exist. An
+    alert may watch several symbols; it is removed from all of them when it
+    fires on any.
+    """
+
+    def __init__(self) -> None:
+        self._sides: Dict[Tuple[str, str], Dict[str, _Side]] = {}
+        self._refs: Dict[str, FieldRef] = {}
+        self._entries: Dict[Hashable, Tuple[Threshold, Tuple[str, ...]]] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def add(self, key: Hashable, threshold: Threshold, symbols: Iterable[str]) -> None:
+        self.remove(key)
+        symbols = tuple(dict.fromkeys(symbols))
+        self._refs.setdefault(threshold.ref.name, threshold.ref)
+        self._sequence += 1
+        for symbol in symbols:
+            sides = self._sides.setdefault((symbol, threshold.ref.name), {})
+            side = sides.get(threshold.operator)
+            if side is None:
+                side = sides[threshold.operator] = _Side()
+            side.add(threshold.value, self._sequence, key)
+        self._entries[key] = (threshold, symbols)
+
+    def remove(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        threshold, symbols = entry
+        for symbol in symbols:
+            bucket = (symbol, threshold.ref.name)
+            sides = self._sides.get(bucket)
+            if sides is None or threshold.operator not in sides:
+                continue
+            side = sides[threshold.operator]
+            side.remove(threshold.value, key)
+            if not side.keys:
+                del sides[threshold.operator]
+                if not sides:
+                    del self._sides[bucket]
+        return True
+
+    def symbols(self) -> Set[str]:
+        return {symbol for symbol, _ in self._sides}
+
+    def fields(self) -> List[FieldRef]:
+        """Distinct fields that have at least one threshold."""
+        return [self._refs[name] for name in {name for _, name in self._sides}]
+
+    def buckets(self) -> List[Tuple[str, FieldRef]]:
+        """Distinct ``(symbol, field)`` pairs that have at least one threshold."""
+        return [(symbol, self._refs[name]) for symbol, name in self._sides]
+
+    def crossed(self, symbol: str, field: str, value: float) -> List[Hashable]:
+        """Pop every alert satisfied by ``value``; NaN satisfies nothing."""
+        sides = self._sides.get((symbol, field))
+        if sides is None or math.isnan(value):
+            return []
+        probe_low = (value, -1)
+        probe_high = (value, math.inf)
+        fired: List[Hashable] = []
+        for operator, side in sides.items():
+            values = side.values
+            if operator == ">":
+                fired.extend(side.pop(0, bisect_left(values, probe_low)))
+            elif operator == ">=":
+                fired.extend(side.pop(0, bisect_right(values, probe_high)))
+            elif operator == "<":
+                fired.extend(side.pop(bisect_right(values, probe_high), len(values)))
+            else:
+                fired.extend(side.pop(bisect_left(values, probe_low), len(values)))
+        fired = list(dict.fromkeys(fired))
+        for key in fired:
+            self.remove(key)
+        return fired
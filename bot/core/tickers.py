@@ -4,10 +4,16 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import json
+import logging
 import os
-from typing import Iterable, List
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class TickerSource:
@@ -46,13 +52,7 @@ def _parse_csv_payload(payload: str) -> List[str]:
     return tickers
 
 
-def _load_from_url(url: str, token: str) -> List[str]:
-    headers = {"User-Agent": "Stock-Bot/1.0"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    request = Request(url, headers=headers)
-    with urlopen(request, timeout=20) as response:
-        payload = response.read().decode("utf-8")
+def _parse_url_payload(url: str, payload: str) -> List[str]:
     if url.endswith(".json"):
         return _parse_json_payload(payload)
     if url.endswith(".csv"):
@@ -60,17 +60,124 @@ def _load_from_url(url: str, token: str) -> List[str]:
     return _parse_text_lines(payload)
 
 
+def _url_headers(token: str) -> Dict[str, str]:
+    headers = {"User-Agent": "Stock-Bot/1.0"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _load_from_url(url: str, token: str) -> List[str]:
+    request = Request(url, headers=_url_headers(token))
+    with urlopen(request, timeout=20) as response:
+        payload = response.read().decode("utf-8")
+    return _parse_url_payload(url, payload)
+
+
+def _missing_file(path: str) -> FileNotFoundError:
+    return FileNotFoundError(
+        f"Ticker file not found: {path}. Provide BEI_TICKERS_FILE or BEI_TICKERS_URL."
+    )
+
+
 def load_tickers(source: TickerSource) -> List[str]:
     if source.url:
         return _load_from_url(source.url, source.url_token)
     if not os.path.exists(source.file_path):
-        raise FileNotFoundError(
-            f"Ticker file not found: {source.file_path}. "
-            "Provide BEI_TICKERS_FILE or BEI_TICKERS_URL."
-        )
+        raise _missing_file(source.file_path)
     with open(source.file_path, "r", encoding="utf-8") as handle:
         return _parse_text_lines(handle.read())
 
 
+class TickerUniverse:
+    """Parsed ticker list cached in memory.
+
+    A local file is re-read only when its mtime changes. A remote list is
+    revalidated at most every ``ttl`` seconds with ``If-None-Match`` /
+    ``If-Modified-Since``, so an unchanged list costs one ``304``. If a refresh
+    fails, the last good list keeps being served.
+    """
+
+    def __init__(
+        self,
+        source: TickerSource,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        timeout: float = 20.0,
+    ) -> None:
+        self.source = source
+        self.ttl = ttl
+        self.clock = clock
+        self.timeout = timeout
+        self._tickers: Optional[List[str]] = None
+        self._checked_at: Optional[float] = None
+        self._mtime: Optional[float] = None
+        self._etag = ""
+        self._last_modified = ""
+        self._lock = threading.Lock()
+
+    def get(self) -> List[str]:
+        with self._lock:
+            try:
+                if self.source.url:
+                    self._refresh_url()
+                else:
+                    self._refresh_file()
+            except Exception as exc:
+                if self._tickers is None:
+                    raise
+                logger.warning("Ticker refresh failed, keeping last list: %s", exc)
+            return list(self._tickers or [])
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = None
+            self._mtime = None
+
+    def _refresh_file(self) -> None:
+        path = self.source.file_path
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            raise _missing_file(path) from None
+        if self._tickers is not None and mtime == self._mtime:
+            return
+        with open(path, "r", encoding="utf-8") as handle:
+            self._tickers = _parse_text_lines(handle.read())
+        self._mtime = mtime
+
+    def _refresh_url(self) -> None:
+        now = self.clock()
+        if (
+            self._tickers is not None
+            and self._checked_at is not None
+            and now - self._checked_at < self.ttl
+        ):
+            return
+        self._checked_at = now
+        headers = _url_headers(self.source.url_token)
+        if self._tickers is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        request = Request(self.source.url, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                payload = response.read().decode("utf-8")
+                etag = response.headers.get("ETag", "")
+                last_modified = response.headers.get("Last-Modified", "")
+        except HTTPError as exc:
+            if exc.code == 304 and self._tickers is not None:
+                return
+            raise
+        tickers = _parse_url_payload(self.source.url, payload)
+        if not tickers:
+            raise ValueError(f"Ticker list from {self.source.url} is empty.")
+        self._tickers = tickers
+        self._etag = etag
+        self._last_modified = last_modified
+
+
 def format_tickers(tickers: Iterable[str]) -> str:
     return ", ".join(sorted(set(tickers)))
@@ -0,0 +1,222 @@
+"""Cross-sectional screening: evaluate a filter over the whole universe at once."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bot.core.filters import FieldReader, FieldRef, FilterPlan, bar_column
+from bot.core.market_data import MarketSnapshot
+from bot.core.streaming import IndicatorRegistry
+
+
+@dataclass(frozen=True)
+class _Prior:
+    """What a matrix keeps of the previous poll's matrix."""
+
+    rows: Dict[str, int]
+    snapshots: List[MarketSnapshot]
+    columns: Dict[str, np.ndarray]
+    errors: Dict[str, Dict[int, str]]
+
+
+# Bars stacked per symbol for the price and volume columns; deeper ``prevN``
+# offsets restack on demand.
+_TAIL_BARS = 8
+
+
+class UniverseMatrix:
+    """Latest field values with one row per symbol and one column per field.
+
+    Columns are filled lazily the first time a plan needs them, so several
+    plans evaluated against the same poll share every column they have in
+    common. Missing values are NaN, which compares false like ``None`` does in
+    the per-symbol path.
+
+    Price, volume and gain columns are gathered in one vectorised step from the
+    last bars of every symbol stacked into a single array. Indicator columns
+    are read per symbol, but a matrix built with ``previous`` carries over the
+    rows whose snapshot has not changed since, so a poll only recomputes the
+    symbols it refetched.
+    """
+
+    def __init__(
+        self,
+        snapshots: Dict[str, MarketSnapshot],
+        indicators: Optional[IndicatorRegistry] = None,
+        previous: Optional["UniverseMatrix"] = None,
+    ) -> None:
+        self.symbols: List[str] = list(snapshots)
+        self.snapshots = [snapshots[symbol] for symbol in self.symbols]
+        self._indicators = indicators
+        self._readers: Dict[int, FieldReader] = {}
+        self._rows: Optional[Dict[str, int]] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._errors: Dict[str, Dict[int, str]] = {}
+        self._tails: Dict[str, Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = {}
+        # Only plain data is kept from ``previous`` so matrices do not chain.
+        self._prior: Optional[_Prior] = None
+        self._unchanged: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        if previous is not None and previous._columns:
+            self._prior = _Prior(
+                rows=previous._row_map(),
+                snapshots=previous.snapshots,
+                columns=dict(previous._columns),
+                errors=dict(previous._errors),
+            )
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _row_map(self) -> Dict[str, int]:
+        if self._rows is None:
+            self._rows = {name: row for row, name in enumerate(self.symbols)}
+        return self._rows
+
+    def row(self, symbol: str) -> Optional[int]:
+        return self._row_map().get(symbol)
+
+    def _reader(self, row: int) -> FieldReader:
+        reader = self._readers.get(row)
+        if reader is None:
+            registry = self._indicators
+            symbol = self.symbols[row]
+            reader = self._readers[row] = FieldReader(
+                self.snapshots[row],
+                registry.for_symbol(symbol) if registry is not None else None,
+            )
+        return reader
+
+    def _tail(self, name: str, depth: int) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+        """Last ``depth`` bars of candle column ``name`` of every row, concatenated.
+
+        Returns ``(depth, values, counts, ends)``: row ``r`` holds ``counts[r]``
+        bars ending just before ``values[ends[r]]``.
+        """
+        cached = self._tails.get(name)
+        if cached is None or cached[0] < depth:
+            depth = max(depth, _TAIL_BARS)
+            pieces = [getattr(snapshot.candles, name)[-depth:] for snapshot in self.snapshots]
+            counts = np.fromiter((len(piece) for piece in pieces), np.int64, len(pieces))
+            values = np.concatenate(pieces) if pieces else np.empty(0)
+            cached = self._tails[name] = (depth, values, counts, np.cumsum(counts))
+        return cached
+
+    def _latest(self, name: str, offset: int) -> np.ndarray:
+        """``name`` ``offset`` bars before each row's last bar; NaN where history is shorter."""
+        _, values, counts, ends = self._tail(name, offset + 1)
+        column = np.full(len(self.symbols), np.nan)
+        ready = counts > offset
+        column[ready] = values[ends[ready] - 1 - offset]
+        return column
+
+    def _gather(self, ref: FieldRef) -> Optional[np.ndarray]:
+        name = bar_column(ref)
+        if name is not None:
+            return self._latest(name, ref.offset)
+        if ref.base != "gain":
+            return None
+        close = self._latest("close", ref.offset)
+        previous = self._latest("close", ref.offset + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(previous == 0, np.nan, (close - previous) / previous * 100)
+
+    def _unchanged_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows whose snapshot is the same object as in ``previous``, and their old rows."""
+        if self._unchanged is None:
+            prior = self._prior
+            current: List[int] = []
+            earlier: List[int] = []
+            if prior is not None:
+                for row, (symbol, snapshot) in enumerate(zip(self.symbols, self.snapshots)):
+                    old = prior.rows.get(symbol)
+                    if old is not None and prior.snapshots[old] is snapshot:
+                        current.append(row)
+                        earlier.append(old)
+            self._unchanged = (np.array(current, dtype=np.int64), np.array(earlier, dtype=np.int64))
+        return self._unchanged
+
+    def _read(self, ref: FieldRef) -> Tuple[np.ndarray, Dict[int, str]]:
+        column = np.full(len(self.symbols), np.nan)
+        errors: Dict[int, str] = {}
+        pending = np.ones(len(self.symbols), dtype=bool)
+        prior = self._prior
+        if prior is not None and ref.name in prior.columns:
+            current, earlier = self._unchanged_rows()
+            column[current] = prior.columns[ref.name][earlier]
+            pending[current] = False
+            old_errors = prior.errors.get(ref.name) or {}
+            if old_errors:
+                moved = dict(zip(earlier.tolist(), current.tolist()))
+                for old, message in old_errors.items():
+                    if old in moved:
+                        errors[moved[old]] = message
+        for row in np.flatnonzero(pending).tolist():
+            try:
+                value = self._reader(row).value(ref)
+            except Exception as exc:  # noqa: BLE001 - one symbol must not sink the sweep
+                errors[row] = str(exc)
+                continue
+            if value is not None:
+                column[row] = value
+        return column, errors
+
+    def column(self, ref: FieldRef) -> np.ndarray:
+        column = self._columns.get(ref.name)
+        if column is not None:
+            return column
+        column = self._gather(ref)
+        errors: Dict[int, str] = {}
+        if column is None:
+            column, errors = self._read(ref)
+        self._columns[ref.name] = column
+        self._errors[ref.name] = errors
+        return column
+
+    def plan_errors(self, plan: FilterPlan) -> Dict[int, str]:
+        """Rows whose fields for ``plan`` raised, with the first error message."""
+        errors: Dict[int, str] = {}
+        for ref in plan.fields:
+            for row, message in self._errors.get(ref.name, {}).items():
+                errors.setdefault(row, message)
+        return errors
+
+    def mask(self, plan: FilterPlan) -> np.ndarray:
+        """Boolean row mask of symbols passing every predicate of ``plan``."""
+        passed = np.ones(len(self.symbols), dtype=bool)
+        for predicate in plan.predicates:
+            if not passed.any():
+                break
+            passed &= predicate.test(self.column)
+        for row in self.plan_errors(plan):
+            passed[row] = False
+        return passed
+
+    def distance(self, plan: FilterPlan) -> np.ndarray:
+        """Per-row relative gap to passing ``plan``: 0 when it passes, inf when unknown.
+
+        The gap of a failing predicate is ``|left - right|`` relative to the
+        larger side; a row's distance is its largest gap over all predicates.
+        """
+        distance = np.zeros(len(self.symbols))
+        for predicate in plan.predicates:
+            left = predicate.left.evaluate(self.column)
+            right = predicate.right.evaluate(self.column)
+            if left is None or right is None:
+                return np.full(len(self.symbols), np.inf)
+            left = np.broadcast_to(np.asarray(left, dtype=float), distance.shape)
+            right = np.broadcast_to(np.asarray(right, dtype=float), distance.shape)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scale = np.maximum(np.abs(left), np.abs(right))
+                gap = np.where(scale > 0, np.abs(left - right) / scale, 0.0)
+                gap = np.where(predicate.compare(left, right), 0.0, gap)
+            distance = np.maximum(distance, np.where(np.isnan(gap), np.inf, gap))
+        for row in self.plan_errors(plan):
+            distance[row] = np.inf
+        return distance
+
+    def matches(self, plan: FilterPlan) -> List[str]:
+        mask = self.mask(plan)
+        return [symbol for symbol, passed in zip(self.symbols, mask) if passed]
@@ -7,7 +7,8 @@ def handle_algo() -> str:
         "Cara kerja: seperti alert, tapi berulang terus-menerus.\n"
         "Sifat: 🔁 jalan otomatis sepanjang jam bursa, setiap saham masuk kriteria → notif.\n"
         "Kapan dipakai: strategi harian / pantauan berkelanjutan (breakout, inflow, volume).\n"
-        "Realtime: memantau semua ticker BEI.\n\n"
+        "Realtime: memantau semua ticker BEI,\n"
+        "atau hanya ticker yang ditulis di depan filter.\n\n"
         "📌 Contoh:\n"
         "/algo gain > 3 + vol > ma20vol title saham momentum harian\n"
         "→ Bot memantau gain > 3% dan volume > rata-rata 20 hari, update selama bursa."
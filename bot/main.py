@@ -31,7 +31,8 @@ def render_help() -> str:
         "- /scr   → screening manual\n"
         "- /alert → alarm sekali pakai\n"
         "- /algo  → screening otomatis & berulang\n"
-        "- /stop  → hentikan alert/algo\n\n"
+        "- /stop  → hentikan alert/algo\n"
+        "- /stats → statistik waktu proses & error\n\n"
         "Contoh:\n"
         "python -m bot.main \"/scr price < 1000 + rsi < 30 title saham murah oversold\""
     )
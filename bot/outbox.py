@@ -0,0 +1,220 @@
+"""Outbound Telegram message queue with rate limits and per-chat coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from bot.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+def _seconds(value: Any) -> float:
+    if hasattr(value, "total_seconds"):
+        return float(value.total_seconds())
+    return float(value)
+
+
+@dataclass
+class ChatQueue:
+    bucket: TokenBucket
+    pending: List[str] = field(default_factory=list)
+    quiet: Optional[str] = None
+    last_quiet: Optional[str] = None
+    # Clock time before which the chat is not sent to, set by a RetryAfter.
+    not_before: float = 0.0
+
+
+def pack_messages(texts: List[str], limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Join texts into as few messages as fit in ``limit`` characters."""
+    messages: List[str] = []
+    current = ""
+    for text in texts:
+        while len(text) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(text[:limit])
+            text = text[limit:]
+        if not current:
+            current = text
+        elif len(current) + 2 + len(text) <= limit:
+            current = f"{current}\n\n{text}"
+        else:
+            messages.append(current)
+            current = text
+    if current:
+        messages.append(current)
+    return messages
+
+
+class Outbox:
+    """Send chat messages from one background task.
+
+    Each chat has its own queue and token bucket, and a global bucket guards
+    the bot-wide flood limit. Chats take turns. When a chat's turn comes,
+    everything queued for it is merged into as few messages as possible.
+    ``quiet`` messages (status chatter such as "no match") are dropped when
+    other news is queued for the chat or when they repeat the last status sent.
+    A chat told to retry later is skipped until then while the others are served.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.clock = clock
+        self._global = TokenBucket(global_rate, max(1.0, global_rate), clock)
+        self._chats: Dict[int, ChatQueue] = {}
+        self._ready: Deque[int] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _chat(self, chat_id: int) -> ChatQueue:
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst, self.clock)
+            queue = self._chats[chat_id] = ChatQueue(bucket=bucket)
+        return queue
+
+    def pending(self, chat_id: Optional[int] = None) -> int:
+        """Messages queued for ``chat_id``, or for every chat when omitted."""
+        if chat_id is None:
+            return sum(self.pending(chat) for chat in list(self._chats))
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            return 0
+        return len(queue.pending) + (queue.quiet is not None)
+
+    def send(self, chat_id: int, text: str, quiet: bool = False) -> None:
+        """Queue ``text`` for ``chat_id``; returns immediately."""
+        queue = self._chat(chat_id)
+        if quiet:
+            if text == queue.last_quiet:
+                return
+            queue.quiet = text
+        else:
+            queue.pending.append(text)
+        if chat_id not in self._ready:
+            self._ready.append(chat_id)
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, chat_id: int) -> None:
+        """Drop everything still queued for ``chat_id``."""
+        queue = self._chats.pop(chat_id, None)
+        if queue is not None and chat_id in self._ready:
+            self._ready.remove(chat_id)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _next_chat(self) -> Tuple[Optional[int], float]:
+        wait = float("inf")
+        for _ in range(len(self._ready)):
+            chat_id = self._ready[0]
+            queue = self._chats[chat_id]
+            delay = max(queue.bucket.delay(), queue.not_before - self.clock())
+            if delay <= 0:
+                self._ready.popleft()
+                return chat_id, 0.0
+            self._ready.rotate(-1)
+            wait = min(wait, delay)
+        return None, wait
+
+    def _take_messages(self, queue: ChatQueue) -> List[str]:
+        texts = list(queue.pending)
+        queue.pending.clear()
+        if texts:
+            queue.last_quiet = None
+        elif queue.quiet is not None:
+            texts = [queue.quiet]
+            queue.last_quiet = queue.quiet
+        queue.quiet = None
+        return pack_messages(texts)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            chat_id, wait = self._next_chat()
+            if chat_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            queue = self._chats.get(chat_id)
+            if queue is None:
+                continue
+            messages = self._take_messages(queue)
+            for position, text in enumerate(messages):
+                await asyncio.sleep(self._global.delay())
+                self._global.take()
+                queue.bucket.take()
+                try:
+                    with metrics.time("send"):
+                        await self.bot.send_message(chat_id=chat_id, text=text)
+                except Exception as exc:  # noqa: BLE001 - one chat must not stop the outbox
+                    metrics.increment("send_errors_total")
+                    retry_after = getattr(exc, "retry_after", None)
+                    if retry_after is None:
+                        logger.exception("Failed to send message to chat %s", chat_id)
+                        continue
+                    queue.pending[:0] = messages[position:]
+                    queue.not_before = self.clock() + _seconds(retry_after)
+                    break
+            if queue.pending or queue.quiet is not None:
+                if chat_id not in self._ready:
+                    self._ready.append(chat_id)
@@ -6,34 +6,160 @@ import asyncio
 import importlib
 import importlib.util
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
+from functools import partial
+import logging
+from typing import Dict, List, Optional, Set, Union
 
 from bot.config import Settings
-from bot.core.engine import run_screening
-from bot.core.filters import parse_filters
+from bot.core.candle_cache import CandleCache
+from bot.core.candle_store import CandleStore
+from bot.core.chart_api import ChartApiProvider
+from bot.core.engine import AsyncScreeningEngine, ScreeningResult
+from bot.core.filters import compile_filters, split_symbols, split_title
+from bot.core.health import CircuitBreaker
 from bot.core.market_data import MarketDataError, MarketDataProvider, YFinanceProvider
-from bot.core.tickers import TickerSource, load_tickers
+from bot.core.market_hours import MarketCalendar
+from bot.core.metrics import metrics
+from bot.core.poller import MarketPoller
+from bot.core.priority import PollPlanner
+from bot.core.sharding import ShardConfig, ShardedPoller, ShardedScreeningEngine
+from bot.core.tickers import TickerSource, TickerUniverse
+from bot.outbox import Outbox
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class AlertState:
-    task: asyncio.Task
+    message: object
+    repeat: bool
+    title: str = ""
     active_symbols: Set[str] = field(default_factory=set)
+    failing_symbols: Set[str] = field(default_factory=set)
+
+
+def build_provider(settings: Settings) -> MarketDataProvider:
+    cache = CandleCache(
+        store=CandleStore(settings.candle_store_dir) if settings.candle_store_dir else None
+    )
+    if settings.market_data_provider == "chart":
+        return ChartApiProvider(
+            settings.yfinance_suffix,
+            base_url=settings.chart_api_url,
+            concurrency=settings.screening_concurrency,
+            timeout=settings.fetch_timeout_seconds,
+            cache=cache,
+        )
+    if settings.market_data_provider != "yfinance":
+        raise ValueError(
+            f"Unknown MARKET_DATA_PROVIDER {settings.market_data_provider!r}; "
+            "use yfinance or chart."
+        )
+    return YFinanceProvider(
+        settings.yfinance_suffix,
+        batch_size=settings.yfinance_batch_size,
+        cache=cache,
+    )
+
+
+# Pipeline order for /stats.
+_STATS_STAGES = [
+    "run_once",
+    "screening",
+    "tickers",
+    "fetch",
+    "fetch_symbol",
+    "download",
+    "convert",
+    "indicators",
+    "evaluate",
+    "evaluate_matrix",
+    "send",
+]
+
+
+def _planner_options(settings: Settings, shards: int = 1) -> Dict[str, float]:
+    budget = settings.fetch_budget
+    return {
+        "budget": -(-budget // shards) if budget else 0,
+        "max_interval": settings.poll_max_backoff_ticks,
+        "proximity": settings.alert_proximity_pct / 100,
+    }
 
 
 class TelegramBot:
     def __init__(self, settings: Settings, provider: Optional[MarketDataProvider] = None) -> None:
         self.settings = settings
-        self.provider = provider or YFinanceProvider(settings.yfinance_suffix)
+        calendar = (
+            MarketCalendar.from_file(
+                settings.idx_holidays_file, settle_seconds=settings.poll_settle_seconds
+            )
+            if settings.market_hours_only
+            else None
+        )
+        self.provider: Optional[MarketDataProvider] = provider
+        self.engine: Union[AsyncScreeningEngine, ShardedScreeningEngine]
+        self.poller: MarketPoller
+        if provider is None and settings.screening_shards > 1:
+            self.engine = ShardedScreeningEngine(
+                ShardConfig(
+                    provider_factory=partial(build_provider, settings),
+                    concurrency=settings.screening_concurrency,
+                    timeout=settings.fetch_timeout_seconds,
+                    failure_cooldown=settings.failure_cooldown_seconds,
+                    no_data_cooldown=settings.no_data_cooldown_seconds,
+                    warmup=settings.ema_warmup_bars,
+                    planner=_planner_options(settings, settings.screening_shards),
+                ),
+                settings.screening_shards,
+            )
+            self.poller = ShardedPoller(
+                self.engine,
+                self.load_ticker_list,
+                settings.poll_interval_seconds,
+                calendar,
+                scoped_interval=settings.symbol_poll_interval_seconds,
+            )
+        else:
+            self.provider = provider or build_provider(settings)
+            self.engine = AsyncScreeningEngine(
+                self.provider,
+                concurrency=settings.screening_concurrency,
+                timeout=settings.fetch_timeout_seconds,
+                breaker=CircuitBreaker(
+                    base_cooldown=settings.failure_cooldown_seconds,
+                    negative_cooldown=settings.no_data_cooldown_seconds,
+                ),
+                warmup=settings.ema_warmup_bars,
+            )
+            self.poller = MarketPoller(
+                self.engine,
+                self.load_ticker_list,
+                settings.poll_interval_seconds,
+                calendar,
+                PollPlanner(**_planner_options(settings)),
+                scoped_interval=settings.symbol_poll_interval_seconds,
+            )
+        self.universe = TickerUniverse(
+            TickerSource(
+                file_path=settings.bei_tickers_file,
+                url=settings.bei_tickers_url,
+                url_token=settings.bei_tickers_url_token,
+            ),
+            ttl=settings.tickers_ttl_seconds,
+        )
+        self.outbox: Optional[Outbox] = None
+        self._metrics_task: Optional[asyncio.Task] = None
         self._alerts: Dict[int, AlertState] = {}
+        self._scans: Dict[int, asyncio.Task] = {}
+        metrics.gauge("alerts_active", lambda: len(self._alerts))
+        metrics.gauge("scans_active", lambda: len(self._scans))
+        metrics.gauge("alert_plans", lambda: len(self.poller.groups()))
+        metrics.gauge("outbox_pending", lambda: self.outbox.pending() if self.outbox else 0)
 
     def load_ticker_list(self) -> List[str]:
-        source = TickerSource(
-            file_path=self.settings.bei_tickers_file,
-            url=self.settings.bei_tickers_url,
-            url_token=self.settings.bei_tickers_url_token,
-        )
-        return load_tickers(source)
+        with metrics.time("tickers"):
+            return self.universe.get()
 
     async def start(self) -> None:
         if importlib.util.find_spec("telegram") is None:
@@ -59,15 +185,50 @@ class TelegramBot:
         async def stop(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             await self._handle_stop(update, context)
 
-        app = Application.builder().token(self.settings.telegram_bot_token).build()
+        async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            await self._handle_stats(update, context)
+
+        app = (
+            Application.builder()
+            .token(self.settings.telegram_bot_token)
+            .concurrent_updates(True)
+            .build()
+        )
         app.add_handler(CommandHandler("scr", scr))
         app.add_handler(CommandHandler("alert", alert))
         app.add_handler(CommandHandler("algo", algo))
         app.add_handler(CommandHandler("stop", stop))
-        await app.initialize()
-        await app.start()
-        await app.updater.start_polling()
-        await app.updater.wait()
+        app.add_handler(CommandHandler("stats", stats))
+        self.outbox = Outbox(
+            app.bot,
+            global_rate=self.settings.telegram_global_rate,
+            chat_rate=self.settings.telegram_chat_rate,
+        )
+        if self.settings.metrics_file:
+            self._metrics_task = asyncio.create_task(
+                self._write_metrics(self.settings.metrics_file)
+            )
+        try:
+            await app.initialize()
+            await app.start()
+            await app.updater.start_polling()
+            await app.updater.wait()
+        finally:
+            await self._stop_background()
+
+    async def _stop_background(self) -> None:
+        """Cancel the metrics writer and the outbox, then shut the screening engine down."""
+        task, self._metrics_task = self._metrics_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.outbox is not None:
+            await self.outbox.stop()
+        # Joining shard workers or the executor blocks, so it runs off the loop.
+        await asyncio.to_thread(self.engine.close)
 
     async def _handle_scr(self, update, context) -> None:
         message = update.effective_message
@@ -75,10 +236,26 @@ class TelegramBot:
             return
         filters_text = " ".join(context.args)
         if not filters_text:
-            await message.reply_text("Gunakan: /scr <filter> (contoh: /scr price < 1000 + rsi < 30)")
+            await message.reply_text(
+                "Gunakan: /scr [ticker] <filter> (contoh: /scr price < 1000 + rsi < 30)"
+            )
+            return
+        chat_id = message.chat_id
+        if chat_id in self._scans:
+            await message.reply_text("Screening masih berjalan. Gunakan /stop untuk membatalkan.")
             return
-        await message.reply_text("🔎 Screening berjalan... (realtime untuk semua BEI)")
-        await self._run_once(message, filters_text)
+        symbols = split_symbols(filters_text)[0]
+        scope = ", ".join(symbols) if symbols else "semua BEI"
+        await message.reply_text(f"🔎 Screening berjalan... (realtime untuk {scope})")
+        task = asyncio.create_task(self._run_once(message, filters_text))
+        self._scans[chat_id] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+        finally:
+            self._scans.pop(chat_id, None)
 
     async def _handle_alert(self, update, context, repeat: bool) -> None:
         message = update.effective_message
@@ -86,80 +263,178 @@ class TelegramBot:
             return
         filters_text = " ".join(context.args)
         if not filters_text:
-            await message.reply_text("Gunakan: /alert <filter> atau /algo <filter>")
+            await message.reply_text(
+                "Gunakan: /alert [ticker] <filter> atau /algo [ticker] <filter>"
+            )
             return
         chat_id = message.chat_id
         if chat_id in self._alerts:
             await message.reply_text("Alert sudah aktif. Gunakan /stop untuk menghentikan.")
             return
+        symbols, filters_text = split_symbols(filters_text)
+        try:
+            plan = compile_filters(filters_text)
+        except ValueError as exc:
+            await message.reply_text(f"Format filter salah: {exc}")
+            return
+        if symbols:
+            try:
+                tickers = await asyncio.to_thread(self.load_ticker_list)
+            except Exception as exc:  # noqa: BLE001
+                await message.reply_text(f"Gagal load ticker BEI: {exc}")
+                return
+            if not await self._check_symbols(message, symbols, tickers):
+                return
+        scope = f"Ticker: {', '.join(symbols)}" if symbols else "Ticker: semua BEI"
         await message.reply_text(
             "✅ Realtime monitoring dimulai.\n"
-            f"Mode: {'berulang' if repeat else 'sekali tembak'}."
+            f"Mode: {'berulang' if repeat else 'sekali tembak'}.\n"
+            f"{scope}."
+        )
+        self._alerts[chat_id] = AlertState(
+            message=message, repeat=repeat, title=split_title(filters_text)[1]
         )
-        task = asyncio.create_task(self._alert_loop(chat_id, message, filters_text, repeat))
-        self._alerts[chat_id] = AlertState(task=task)
+
+        async def on_tick(results: List[ScreeningResult], errors: List[str]) -> None:
+            await self._handle_tick(chat_id, results, errors)
+
+        self.poller.subscribe(chat_id, plan, on_tick, symbols=symbols, once=not repeat)
+
+    async def _check_symbols(self, message, symbols: List[str], tickers: List[str]) -> bool:
+        known = set(tickers)
+        unknown = [symbol for symbol in symbols if symbol not in known]
+        if unknown:
+            await message.reply_text(f"Ticker tidak dikenal: {', '.join(unknown)}")
+            return False
+        return True
 
     async def _handle_stop(self, update, context) -> None:
         message = update.effective_message
         if not message:
             return
         chat_id = message.chat_id
+        scan = self._scans.pop(chat_id, None)
+        if scan:
+            scan.cancel()
+            await message.reply_text("🛑 Screening dibatalkan.")
         state = self._alerts.pop(chat_id, None)
         if not state:
-            await message.reply_text("Tidak ada alert aktif.")
+            if not scan:
+                await message.reply_text("Tidak ada alert aktif.")
             return
-        state.task.cancel()
+        self.poller.unsubscribe(chat_id)
+        if self.outbox is not None:
+            self.outbox.discard(chat_id)
         await message.reply_text("🛑 Alert dihentikan.")
 
-    async def _alert_loop(self, chat_id: int, message, filters_text: str, repeat: bool) -> None:
-        try:
-            while True:
-                matched = await self._run_once(message, filters_text, track_state=repeat, chat_id=chat_id)
-                if matched and not repeat:
-                    await message.reply_text("🎯 Alert selesai (sekali tembak).")
-                    break
-                await asyncio.sleep(self.settings.poll_interval_seconds)
-        except asyncio.CancelledError:
+    async def _handle_stats(self, update, context) -> None:
+        message = update.effective_message
+        if not message:
             return
-        finally:
-            self._alerts.pop(chat_id, None)
+        await message.reply_text(metrics.summary(_STATS_STAGES))
 
-    async def _run_once(
+    async def _write_metrics(self, path: str) -> None:
+        while True:
+            await asyncio.sleep(self.settings.poll_interval_seconds)
+            try:
+                await asyncio.to_thread(metrics.write_prometheus, path)
+            except OSError:
+                logger.exception("Failed to write metrics to %s", path)
+
+    async def _handle_tick(
         self,
-        message,
-        filters_text: str,
-        track_state: bool = False,
-        chat_id: Optional[int] = None,
-    ) -> bool:
+        chat_id: int,
+        results: List[ScreeningResult],
+        errors: List[str],
+    ) -> None:
+        state = self._alerts.get(chat_id)
+        if state is None:
+            return
+        errors = self._new_errors(state, results, errors)
+        if not results and not errors:
+            return
+        matched = await self._report(state.message, results, errors, state, state.title)
+        if matched and not state.repeat:
+            self._alerts.pop(chat_id, None)
+            self.poller.unsubscribe(chat_id)
+            await self._send(state.message, "🎯 Alert selesai (sekali tembak).")
+
+    @staticmethod
+    def _new_errors(
+        state: AlertState, results: List[ScreeningResult], errors: List[str]
+    ) -> List[str]:
+        """Errors for symbols not yet reported to this alert; a recovered symbol is reported again."""
+        state.failing_symbols.difference_update(result.symbol for result in results)
+        fresh = [error for error in errors if error.split(":", 1)[0] not in state.failing_symbols]
+        state.failing_symbols.update(error.split(":", 1)[0] for error in errors if ":" in error)
+        return fresh
+
+    async def _send(self, message, text: str, quiet: bool = False) -> None:
+        """Queue through the outbox when running; ``quiet`` marks droppable status chatter."""
+        if self.outbox is None:
+            with metrics.time("send"):
+                await message.reply_text(text)
+            return
+        self.outbox.send(message.chat_id, text, quiet=quiet)
+
+    async def _run_once(self, message, filters_text: str) -> bool:
+        metrics.increment("screenings_total")
+        with metrics.time("run_once"):
+            return await self._screen(message, filters_text)
+
+    async def _screen(self, message, filters_text: str) -> bool:
+        symbols, filters_text = split_symbols(filters_text)
         try:
-            conditions = parse_filters(filters_text)
+            plan = compile_filters(filters_text)
         except ValueError as exc:
             await message.reply_text(f"Format filter salah: {exc}")
             return False
 
         try:
-            tickers = self.load_ticker_list()
+            tickers = await asyncio.to_thread(self.load_ticker_list)
         except Exception as exc:  # noqa: BLE001
             await message.reply_text(f"Gagal load ticker BEI: {exc}")
             return False
+        if symbols:
+            if not await self._check_symbols(message, symbols, tickers):
+                return False
+            tickers = symbols
+
+        results, errors = await self.engine.run(tickers, plan)
+        return await self._report(message, results, errors, title=split_title(filters_text)[1])
+
+    async def _report(
+        self,
+        message,
+        results: List[ScreeningResult],
+        errors: List[str],
+        state: Optional[AlertState] = None,
+        title: str = "",
+    ) -> bool:
+        if not results and errors:
+            await self._send(message, "⚠️ " + "\n".join(errors[:10]))
+            return False
 
-        results, errors = run_screening(self.provider, tickers, conditions)
         matched = [result.symbol for result in results if result.passed]
 
-        if track_state and chat_id is not None:
-            state = self._alerts.get(chat_id)
-            if state:
-                new_matches = [s for s in matched if s not in state.active_symbols]
-                state.active_symbols.update(new_matches)
-                matched = new_matches
+        if state is not None:
+            new_matches = [s for s in matched if s not in state.active_symbols]
+            state.active_symbols.update(new_matches)
+            matched = new_matches
 
         if matched:
-            await message.reply_text("✅ Saham memenuhi kriteria: " + ", ".join(matched))
+            header = f"✅ {title}: " if title else "✅ Saham memenuhi kriteria: "
+            await self._send(message, header + ", ".join(matched))
         else:
-            await message.reply_text("Tidak ada saham yang memenuhi kriteria saat ini.")
+            # Only alert ticks repeat the status; a /scr always gets its answer.
+            await self._send(
+                message,
+                "Tidak ada saham yang memenuhi kriteria saat ini.",
+                quiet=state is not None,
+            )
 
         if errors:
-            await message.reply_text("⚠️ Beberapa data gagal diambil:\n" + "\n".join(errors[:10]))
+            await self._send(message, "⚠️ Beberapa data gagal diambil:\n" + "\n".join(errors[:10]))
         return bool(matched)
 
 